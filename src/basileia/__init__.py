@@ -9,9 +9,6 @@ from .core.buffers import RegulatoryBuffers, BufferBreach
 # Metrics and ratios
 from .metrics.ratios import CapitalRatios, LeverageRatio
 
-# Portfolio simulation
-from .simulator.portfolio import PortfolioGenerator
-
 # IFRS 9 Expected Credit Loss
 from .accounting.ifrs9 import IFRS9Calculator, ECLResult
 
@@ -21,8 +18,23 @@ from .liquidity.lcr import LCRCalculator, LCRResult
 # ICAAP and Pillar 2
 from .icaap.processor import ICAAProcessor, ICAAResult
 
-# Regulatory reporting
-from .reporting.corep import COREPGenerator, COREPReport
+# Portfolio simulation and regulatory reporting are imported on first access
+_LAZY_IMPORTS = {
+    "PortfolioGenerator": ".simulator.portfolio",
+    "COREPGenerator": ".reporting.corep",
+    "COREPReport": ".reporting.corep",
+}
+
+
+def __getattr__(name):
+    """Resolve heavy submodule exports lazily (PEP 562)."""
+    if name in _LAZY_IMPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __version__ = "0.1.0"
 __author__ = "Basel Capital Engine Contributors"
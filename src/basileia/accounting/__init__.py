@@ -1,12 +1,13 @@
 """IFRS 9 Expected Credit Loss calculations for Basel Capital Engine."""
 
-from .ifrs9 import IFRS9Calculator, ECLResult, ECLStage
+from .ifrs9 import IFRS9Calculator, ECLResult, ECLStage, stage_transition_matrix
 from .provisions import ProvisioningEngine, ProvisionResult
 
 __all__ = [
     "IFRS9Calculator",
     "ECLResult", 
     "ECLStage",
+    "stage_transition_matrix",
     "ProvisioningEngine",
     "ProvisionResult",
 ]
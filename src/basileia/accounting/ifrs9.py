@@ -1,11 +1,13 @@
 """IFRS 9 Expected Credit Loss calculations integrated with Basel III framework."""
 
-from typing import Dict, List, Optional, Any
-from enum import Enum
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Tuple
+from enum import IntEnum
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from pydantic import BaseModel, Field, field_serializer, field_validator
 import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
+import math
 import logging
 
 from ..core.exposure import Portfolio, Exposure
@@ -13,13 +15,27 @@ from ..core.config import BaselConfig
 
 logger = logging.getLogger(__name__)
 
+_STANDARD_NORMAL = NormalDist()
 
-class ECLStage(str, Enum):
-    """IFRS 9 ECL staging classification."""
+# Portfolios above this size are staged with the vectorised NumPy path
+PARALLEL_ECL_THRESHOLD = 50_000
+
+
+class ECLStage(IntEnum):
+    """
+    IFRS 9 ECL staging classification (values index per-stage arrays).
     
-    STAGE_1 = "stage_1"  # 12-month ECL
-    STAGE_2 = "stage_2"  # Lifetime ECL (not credit-impaired)
-    STAGE_3 = "stage_3"  # Lifetime ECL (credit-impaired)
+    Serialised by ``label`` (``"stage_1"`` etc.), as in earlier releases.
+    """
+    
+    STAGE_1 = 0  # 12-month ECL
+    STAGE_2 = 1  # Lifetime ECL (not credit-impaired)
+    STAGE_3 = 2  # Lifetime ECL (credit-impaired)
+    
+    @property
+    def label(self) -> str:
+        """Reporting label, e.g. ``"stage_1"``."""
+        return self.name.lower()
 
 
 class ECLResult(BaseModel):
@@ -39,9 +55,25 @@ class ECLResult(BaseModel):
     days_past_due: int = Field(default=0, ge=0)
     
     # Additional metrics
-    coverage_ratio: float = Field(description="ECL / EAD ratio")
+    coverage_ratio: float = Field(default=0.0, description="ECL / EAD ratio")
+    
+    @field_validator("stage", mode="before")
+    @classmethod
+    def parse_stage(cls, v: Any) -> Any:
+        """Accept stage labels such as ``"stage_2"`` as well as stage values."""
+        if isinstance(v, str):
+            try:
+                return ECLStage[v.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown ECL stage: {v}") from None
+        return v
     
-    def __post_init__(self):
+    @field_serializer("stage")
+    def serialize_stage(self, stage: ECLStage) -> str:
+        """Serialise the stage by its reporting label."""
+        return stage.label
+    
+    def model_post_init(self, __context: Any) -> None:
         """Calculate derived metrics."""
         if self.ead > 0:
             self.coverage_ratio = self.ecl_amount / self.ead
@@ -49,6 +81,167 @@ class ECLResult(BaseModel):
             self.coverage_ratio = 0.0
 
 
+def stage_transition_matrix(rho: float, pd_vector: Tuple[float, float], horizon: int = 1,
+                            credit_cycle: float = 0.0) -> np.ndarray:
+    """
+    Stage transition matrix from a one-factor structural (Merton/Belkin) model.
+    
+    Stage 1 and Stage 2 obligors are placed at the distance-to-default implied by
+    their 12-month PDs in ``pd_vector``. An obligor migrates to Stage 2 when its
+    distance-to-default falls to the Stage 2 level, cures to Stage 1 when it rises
+    back to the Stage 1 level, and Stage 3 (default) is absorbing. ``rho`` is the
+    asset correlation and ``credit_cycle`` the systematic factor Z (negative values
+    are downturns); with Z = 0 and rho = 0 the rows reproduce ``pd_vector`` exactly.
+    
+    Results are cached on the parameter tuple, and multi-year matrices are computed
+    as powers of the cached one-year matrix, so lifetime-ECL grids reuse them.
+    The returned array is read-only.
+    """
+    # Normalise the arguments so equivalent calls share one cache entry
+    pd_stage_1, pd_stage_2 = pd_vector
+    return _stage_transition_matrix(float(rho), (float(pd_stage_1), float(pd_stage_2)),
+                                    int(horizon), float(credit_cycle))
+
+
+@lru_cache(maxsize=256)
+def _stage_transition_matrix(rho: float, pd_vector: Tuple[float, float], horizon: int,
+                             credit_cycle: float) -> np.ndarray:
+    if horizon < 1:
+        raise ValueError("Horizon must be at least one year")
+    
+    if horizon > 1:
+        one_year = _stage_transition_matrix(rho, pd_vector, 1, credit_cycle)
+        matrix = np.linalg.matrix_power(one_year, horizon)
+        matrix.setflags(write=False)
+        return matrix
+    
+    pd_stage_1, pd_stage_2 = pd_vector
+    if not 0 < pd_stage_1 < pd_stage_2 < 1:
+        raise ValueError("Stage PDs must satisfy 0 < PD(stage 1) < PD(stage 2) < 1")
+    if not 0 <= rho < 1:
+        raise ValueError("Asset correlation must be in [0, 1)")
+    
+    # Distance-to-default for each performing stage
+    dd_stage_1 = -_STANDARD_NORMAL.inv_cdf(pd_stage_1)
+    dd_stage_2 = -_STANDARD_NORMAL.inv_cdf(pd_stage_2)
+    
+    # Conditional CDF of the idiosyncratic shock given the systematic factor
+    shift = math.sqrt(rho) * credit_cycle
+    scale = math.sqrt(1 - rho)
+    
+    def conditional_cdf(threshold: float) -> float:
+        return _STANDARD_NORMAL.cdf((threshold - shift) / scale)
+    
+    # Stage 1: default below -DD1, Stage 2 below DD2 - DD1
+    s1_default = conditional_cdf(-dd_stage_1)
+    s1_not_stage_1 = conditional_cdf(dd_stage_2 - dd_stage_1)
+    
+    # Stage 2: default below -DD2, cure above DD1 - DD2
+    s2_default = conditional_cdf(-dd_stage_2)
+    s2_not_cured = conditional_cdf(dd_stage_1 - dd_stage_2)
+    
+    matrix = np.array([
+        [1 - s1_not_stage_1, s1_not_stage_1 - s1_default, s1_default],  # From Stage 1
+        [1 - s2_not_cured, s2_not_cured - s2_default, s2_default],      # From Stage 2
+        [0.0, 0.0, 1.0]                                                 # From Stage 3
+    ])
+    matrix.setflags(write=False)
+    return matrix
+
+
+def _exposure_ecl_arrays(exposures: List[Exposure]) -> Dict[str, np.ndarray]:
+    """Extract the read-only columns needed by ``_chunk_ecl`` from exposures."""
+    nan = float('nan')
+    
+    def optional(value: Optional[float]) -> float:
+        return nan if value is None else value
+    
+    return {
+        'ead': np.array([e.current_exposure for e in exposures], dtype=float),
+        'pd': np.array([optional(e.probability_of_default) for e in exposures], dtype=float),
+        'lgd': np.array([optional(e.loss_given_default) for e in exposures], dtype=float),
+        'maturity': np.array([optional(e.maturity) for e in exposures], dtype=float),
+        'days_past_due': np.array([getattr(e, 'days_past_due', 0) for e in exposures], dtype=float),
+        'defaulted': np.array([bool(getattr(e, 'defaulted', False)) for e in exposures], dtype=bool),
+        'origination_pd': np.array([optional(getattr(e, 'origination_pd', None)) for e in exposures],
+                                   dtype=float),
+        'downgrade_notches': np.array([optional(getattr(e, 'rating_downgrade_notches', None))
+                                       for e in exposures], dtype=float),
+        'recovery_rate': np.array([optional(getattr(e, 'expected_recovery_rate', None))
+                                   for e in exposures], dtype=float),
+    }
+
+
+def _chunk_ecl(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Vectorised staging and ECL for a chunk of exposures.
+    
+    Mirrors ``IFRS9Calculator.calculate_exposure_ecl``; missing optional inputs are
+    NaN and fall back to the same defaults as the scalar path. Module-level so it
+    can be pickled into worker processes.
+    """
+    ead = arrays['ead']
+    pd_raw = arrays['pd']
+    dpd = arrays['days_past_due']
+    origination_pd = arrays['origination_pd']
+    
+    pd_12m = np.where(pd_raw > 0, pd_raw, 0.01)
+    lgd = np.where(arrays['lgd'] > 0, arrays['lgd'], 0.45)
+    maturity = np.where(arrays['maturity'] > 0, arrays['maturity'], 5.0)
+    downgrade_notches = arrays['downgrade_notches']
+    defaulted = arrays['defaulted']
+    
+    # Performing exposures with no staging triggers are Stage 1 outright; only
+    # the remainder runs the Stage 2 / Stage 3 tests
+    # Any non-zero origination PD counts as present, matching the scalar truthiness test
+    has_origination = (origination_pd != 0) & ~np.isnan(origination_pd)
+    stage1_fast = ((dpd < 30) & ~defaulted & ~(pd_raw > 0.95)
+                   & ~has_origination & ~(downgrade_notches >= 3))
+    rest = np.flatnonzero(~stage1_fast)
+    
+    credit_impaired = np.zeros(len(ead), dtype=bool)
+    significant_increase = np.zeros(len(ead), dtype=bool)
+    stage = np.full(len(ead), ECLStage.STAGE_1, dtype=np.int8)
+    
+    if rest.size:
+        dpd_rest = dpd[rest]
+        pd_rest = pd_raw[rest]
+        current_pd = np.nan_to_num(pd_rest, nan=0.0)
+        orig_rest = origination_pd[rest]
+        orig_present = has_origination[rest]
+        
+        impaired_rest = (dpd_rest > 90) | defaulted[rest] | (pd_rest > 0.95)
+        sicr_rest = (
+            (dpd_rest >= 30)
+            | (orig_present & (current_pd > 2.0 * orig_rest))
+            | (orig_present & (orig_rest < 0.01) & (current_pd > 0.005))
+            | (downgrade_notches[rest] >= 3)
+        )
+        
+        credit_impaired[rest] = impaired_rest
+        significant_increase[rest] = sicr_rest
+        stage[rest] = np.where(impaired_rest, ECLStage.STAGE_3,
+                               np.where(sicr_rest, ECLStage.STAGE_2, ECLStage.STAGE_1))
+    
+    lifetime_pd = np.minimum(1 - (1 - pd_12m) ** maturity, 0.99)
+    recovery_rate = arrays['recovery_rate']
+    
+    ecl = np.select(
+        [stage == ECLStage.STAGE_1, stage == ECLStage.STAGE_2, np.isnan(recovery_rate)],
+        [ead * pd_12m * lgd, ead * lifetime_pd * lgd, ead * lgd],
+        default=ead * (1.0 - recovery_rate)
+    )
+    
+    return {
+        'stage': stage,
+        'ecl': ecl,
+        'lgd': lgd,
+        'lifetime_pd': lifetime_pd,
+        'significant_increase': significant_increase,
+        'credit_impaired': credit_impaired,
+    }
+
+
 class IFRS9Calculator:
     """
     IFRS 9 Expected Credit Loss calculator integrated with Basel III.
@@ -61,11 +254,22 @@ class IFRS9Calculator:
         """Initialize IFRS 9 calculator."""
         self.config = config or BaselConfig()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
     
-    def calculate_portfolio_ecl(self, portfolio: Portfolio) -> Dict[str, ECLResult]:
-        """Calculate ECL for entire portfolio."""
+    def calculate_portfolio_ecl(self, portfolio: Portfolio,
+                                n_workers: Optional[int] = None) -> Dict[str, ECLResult]:
+        """
+        Calculate ECL for entire portfolio.
+        
+        Portfolios larger than ``PARALLEL_ECL_THRESHOLD`` are staged with the
+        vectorised ``_chunk_ecl``, in-process by default. Pass ``n_workers > 1`` to
+        split the work into that many chunks across a process pool.
+        """
         self.logger.info(f"Calculating IFRS 9 ECL for portfolio with {len(portfolio.exposures)} exposures")
         
+        if len(portfolio.exposures) > PARALLEL_ECL_THRESHOLD:
+            return self._calculate_portfolio_ecl_chunked(portfolio.exposures, n_workers)
+        
         results = {}
         for exposure in portfolio.exposures:
             ecl_result = self.calculate_exposure_ecl(exposure)
@@ -73,6 +277,55 @@ class IFRS9Calculator:
         
         return results
     
+    def _calculate_portfolio_ecl_chunked(self, exposures: List[Exposure],
+                                         n_workers: Optional[int]) -> Dict[str, ECLResult]:
+        """Stage and measure ECL on NumPy chunks, optionally across processes."""
+        n_workers = max(1, n_workers or 1)
+        arrays = _exposure_ecl_arrays(exposures)
+        
+        bounds = np.linspace(0, len(exposures), n_workers + 1).astype(int)
+        chunks = [
+            {name: column[start:stop] for name, column in arrays.items()}
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+        
+        if n_workers == 1:
+            chunk_results = [_chunk_ecl(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                chunk_results = list(executor.map(_chunk_ecl, chunks))
+        
+        merged = {
+            name: np.concatenate([chunk[name] for chunk in chunk_results])
+            for name in chunk_results[0]
+        }
+        
+        results = {}
+        for i, exposure in enumerate(exposures):
+            stage = ECLStage(int(merged['stage'][i]))
+            if stage == ECLStage.STAGE_1:
+                pd_lifetime = None
+            elif stage == ECLStage.STAGE_2:
+                pd_lifetime = float(merged['lifetime_pd'][i])
+            else:
+                pd_lifetime = 1.0
+            
+            results[exposure.exposure_id] = ECLResult(
+                exposure_id=exposure.exposure_id,
+                stage=stage,
+                ecl_amount=float(merged['ecl'][i]),
+                ead=exposure.current_exposure,
+                pd_12m=exposure.probability_of_default,
+                pd_lifetime=pd_lifetime,
+                lgd=float(merged['lgd'][i]),
+                significant_increase_risk=bool(merged['significant_increase'][i]),
+                credit_impaired=bool(merged['credit_impaired'][i]),
+                days_past_due=getattr(exposure, 'days_past_due', 0)
+            )
+        
+        return results
+    
     def calculate_exposure_ecl(self, exposure: Exposure) -> ECLResult:
         """Calculate ECL for individual exposure."""
         
@@ -98,14 +351,24 @@ class IFRS9Calculator:
             pd_12m=exposure.probability_of_default,
             pd_lifetime=pd_used if stage != ECLStage.STAGE_1 else None,
             lgd=exposure.loss_given_default or 0.45,  # Default LGD if not specified
-            significant_increase_risk=self._has_significant_increase_risk(exposure),
-            credit_impaired=self._is_credit_impaired(exposure),
+            significant_increase_risk=(stage == ECLStage.STAGE_2 or (
+                stage == ECLStage.STAGE_3 and self._has_significant_increase_risk(exposure))),
+            credit_impaired=stage == ECLStage.STAGE_3,
             days_past_due=getattr(exposure, 'days_past_due', 0)
         )
     
     def _determine_stage(self, exposure: Exposure) -> ECLStage:
         """Determine IFRS 9 stage for exposure."""
         
+        # Fast path: the bulk of a performing book has no staging trigger at all
+        pd = exposure.probability_of_default
+        if (getattr(exposure, 'days_past_due', 0) < 30
+                and not getattr(exposure, 'defaulted', False)
+                and (pd is None or pd <= 0.95)
+                and not getattr(exposure, 'origination_pd', None)
+                and getattr(exposure, 'rating_downgrade_notches', 0) < 3):
+            return ECLStage.STAGE_1
+        
         # Stage 3: Credit-impaired (defaulted)
         if self._is_credit_impaired(exposure):
             return ECLStage.STAGE_3
@@ -172,8 +435,9 @@ class IFRS9Calculator:
         # 12-month ECL = EAD × PD(12m) × LGD
         ecl = ead * pd_12m * lgd
         
-        self.logger.debug(f"Stage 1 ECL for {exposure.exposure_id}: {ecl:.2f} "
-                         f"(EAD: {ead:.2f}, PD: {pd_12m:.4f}, LGD: {lgd:.4f})")
+        if self._debug:
+            self.logger.debug("Stage 1 ECL for %s: %.2f (EAD: %.2f, PD: %.4f, LGD: %.4f)",
+                              exposure.exposure_id, ecl, ead, pd_12m, lgd)
         
         return ecl
     
@@ -186,8 +450,9 @@ class IFRS9Calculator:
         # Lifetime ECL = EAD × PD(Lifetime) × LGD
         ecl = ead * pd_lifetime * lgd
         
-        self.logger.debug(f"Stage 2 ECL for {exposure.exposure_id}: {ecl:.2f} "
-                         f"(EAD: {ead:.2f}, PD_LT: {pd_lifetime:.4f}, LGD: {lgd:.4f})")
+        if self._debug:
+            self.logger.debug("Stage 2 ECL for %s: %.2f (EAD: %.2f, PD_LT: %.4f, LGD: %.4f)",
+                              exposure.exposure_id, ecl, ead, pd_lifetime, lgd)
         
         return ecl
     
@@ -196,14 +461,15 @@ class IFRS9Calculator:
         ead = exposure.current_exposure
         lgd = exposure.loss_given_default or 0.45
         
-        # For defaulted exposures, PD = 1.0
-        # May need to consider partial recovery expectations
-        recovery_rate = getattr(exposure, 'expected_recovery_rate', 1 - lgd)
-        
-        ecl = ead * (1 - recovery_rate)
+        # For defaulted exposures, PD = 1.0; an explicit recovery expectation
+        # overrides LGD, otherwise the loss is EAD × LGD
+        recovery_rate = getattr(exposure, 'expected_recovery_rate', None)
+        ecl = ead * lgd if recovery_rate is None else ead * (1.0 - recovery_rate)
         
-        self.logger.debug(f"Stage 3 ECL for {exposure.exposure_id}: {ecl:.2f} "
-                         f"(EAD: {ead:.2f}, Recovery: {recovery_rate:.4f})")
+        if self._debug:
+            self.logger.debug("Stage 3 ECL for %s: %.2f (EAD: %.2f, Recovery: %.4f)",
+                              exposure.exposure_id, ecl, ead,
+                              1 - lgd if recovery_rate is None else recovery_rate)
         
         return ecl
     
@@ -223,21 +489,20 @@ class IFRS9Calculator:
         """Calculate portfolio-level ECL summary."""
         ecl_results = self.calculate_portfolio_ecl(portfolio)
         
-        # Aggregate by stage
-        stage_summary = {
-            ECLStage.STAGE_1: {'count': 0, 'ead': 0, 'ecl': 0},
-            ECLStage.STAGE_2: {'count': 0, 'ead': 0, 'ecl': 0},
-            ECLStage.STAGE_3: {'count': 0, 'ead': 0, 'ecl': 0}
-        }
+        # Aggregate by stage (ECLStage values index the arrays)
+        n_stages = len(ECLStage)
+        count = np.zeros(n_stages, dtype=np.int64)
+        ead = np.zeros(n_stages)
+        ecl = np.zeros(n_stages)
         
         for result in ecl_results.values():
-            stage_summary[result.stage]['count'] += 1
-            stage_summary[result.stage]['ead'] += result.ead
-            stage_summary[result.stage]['ecl'] += result.ecl_amount
+            count[result.stage] += 1
+            ead[result.stage] += result.ead
+            ecl[result.stage] += result.ecl_amount
         
         # Calculate coverage ratios
-        total_ead = sum(s['ead'] for s in stage_summary.values())
-        total_ecl = sum(s['ecl'] for s in stage_summary.values())
+        total_ead = float(ead.sum())
+        total_ecl = float(ecl.sum())
         overall_coverage = total_ecl / total_ead if total_ead > 0 else 0
         
         return {
@@ -246,14 +511,14 @@ class IFRS9Calculator:
             'total_ecl': total_ecl,
             'overall_coverage_ratio': overall_coverage,
             'stage_breakdown': {
-                stage.value: {
-                    'count': data['count'],
-                    'ead': data['ead'],
-                    'ecl': data['ecl'],
-                    'coverage_ratio': data['ecl'] / data['ead'] if data['ead'] > 0 else 0,
-                    'percentage_of_portfolio': data['ead'] / total_ead if total_ead > 0 else 0
+                stage.label: {
+                    'count': int(count[stage]),
+                    'ead': float(ead[stage]),
+                    'ecl': float(ecl[stage]),
+                    'coverage_ratio': float(ecl[stage] / ead[stage]) if ead[stage] > 0 else 0,
+                    'percentage_of_portfolio': float(ead[stage] / total_ead) if total_ead > 0 else 0
                 }
-                for stage, data in stage_summary.items()
+                for stage in ECLStage
             }
         }
     
@@ -278,16 +543,20 @@ class IFRS9Calculator:
         if len(historical_results) != len(actual_losses):
             raise ValueError("Historical results and actual losses must have same length")
         
-        predicted_ecl = [r.ecl_amount for r in historical_results]
+        predicted = np.fromiter((r.ecl_amount for r in historical_results),
+                                dtype=np.float64, count=len(historical_results))
+        actual = np.asarray(actual_losses, dtype=np.float64)
         
-        # Calculate validation metrics
-        mae = np.mean(np.abs(np.array(predicted_ecl) - np.array(actual_losses)))
-        mse = np.mean((np.array(predicted_ecl) - np.array(actual_losses)) ** 2)
-        rmse = np.sqrt(mse)
+        # Calculate validation metrics from a single difference vector
+        n = len(predicted)
+        diff = predicted - actual
+        mae = np.linalg.norm(diff, 1) / n
+        rmse = np.linalg.norm(diff) / np.sqrt(n)
+        mse = rmse * rmse
         
         # Coverage ratio (predicted vs actual)
-        total_predicted = sum(predicted_ecl)
-        total_actual = sum(actual_losses)
+        total_predicted = float(predicted.sum())
+        total_actual = float(actual.sum())
         coverage_ratio = total_predicted / total_actual if total_actual > 0 else float('inf')
         
         return {
@@ -4,7 +4,7 @@ from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 import logging
 
-from .ifrs9 import IFRS9Calculator, ECLResult
+from .ifrs9 import IFRS9Calculator, ECLResult, ECLStage
 
 logger = logging.getLogger(__name__)
 
@@ -32,25 +32,22 @@ class ProvisioningEngine:
     def calculate_provisions(self, ecl_results: Dict[str, ECLResult]) -> ProvisionResult:
         """Calculate total provisions from ECL results."""
         
-        stage_provisions = {
-            'stage_1': 0.0,
-            'stage_2': 0.0, 
-            'stage_3': 0.0
-        }
+        # Indexed by ECLStage
+        stage_provisions = [0.0] * len(ECLStage)
         
         total_ead = 0.0
         
         for result in ecl_results.values():
-            stage_provisions[result.stage.value] += result.ecl_amount
+            stage_provisions[result.stage] += result.ecl_amount
             total_ead += result.ead
         
-        total_provisions = sum(stage_provisions.values())
+        total_provisions = sum(stage_provisions)
         
         return ProvisionResult(
             total_provisions=total_provisions,
-            stage_1_provisions=stage_provisions['stage_1'],
-            stage_2_provisions=stage_provisions['stage_2'],
-            stage_3_provisions=stage_provisions['stage_3'],
+            stage_1_provisions=stage_provisions[ECLStage.STAGE_1],
+            stage_2_provisions=stage_provisions[ECLStage.STAGE_2],
+            stage_3_provisions=stage_provisions[ECLStage.STAGE_3],
             provision_coverage_ratio=total_provisions / total_ead if total_ead > 0 else 0,
             provision_to_loans_ratio=total_provisions / total_ead if total_ead > 0 else 0
         )
@@ -1,9 +1,19 @@
 """Regulatory buffers and breach calculations for Basel Capital Engine."""
 
+from bisect import bisect_left
 from enum import Enum
-from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from typing import ClassVar, Iterator, Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, asdict
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
+import numpy as np
+
+# Pillar 1 minimum CET1 ratio (before buffers)
+_MIN_CET1 = 0.045
+
+# MDA restriction by conservation-buffer shortfall bucket (upper bucket edges)
+_MDA_EDGES = (0.00625, 0.0125, 0.01875, 0.025)
+_MDA_PCTS = (1.0, 0.8, 0.6, 0.4, 0.0)
 
 
 class BufferType(str, Enum):
@@ -16,35 +26,42 @@ class BufferType(str, Enum):
     SYSTEMIC_RISK = "systemic_risk"        # Systemic Risk Buffer
 
 
-class BufferBreach(BaseModel):
+# Buffer breakdown keys -> BufferType, avoiding Enum value lookups in loops
+_NAME_TO_BUFFER_TYPE = {bt.value: bt for bt in BufferType}
+
+
+@dataclass(slots=True)
+class BufferBreach:
     """Represents a buffer breach with associated restrictions."""
     
     buffer_type: BufferType
-    required_ratio: float = Field(ge=0, le=1, description="Required buffer ratio")
-    actual_ratio: float = Field(ge=0, le=1, description="Actual capital ratio")
-    shortfall_ratio: float = Field(ge=0, description="Shortfall in ratio terms")
-    shortfall_amount: float = Field(ge=0, description="Shortfall in monetary terms")
+    required_ratio: float    # Required buffer ratio (0-1)
+    actual_ratio: float      # Actual capital ratio (0-1)
+    shortfall_ratio: float   # Shortfall in ratio terms (>= 0)
+    shortfall_amount: float  # Shortfall in monetary terms (>= 0)
     
     # Maximum Distributable Amount restrictions
     mda_applicable: bool = False
-    mda_restriction_pct: float = Field(default=0, ge=0, le=1, description="MDA restriction percentage")
+    mda_restriction_pct: float = 0.0  # MDA restriction percentage (0-1)
+    
+    def __post_init__(self) -> None:
+        if not 0 <= self.required_ratio <= 1 or not 0 <= self.actual_ratio <= 1:
+            raise ValueError("Buffer ratios must be between 0 and 1")
+        if self.shortfall_ratio < 0 or self.shortfall_amount < 0:
+            raise ValueError("Buffer shortfall must be non-negative")
+        if not 0 <= self.mda_restriction_pct <= 1:
+            raise ValueError("MDA restriction percentage must be between 0 and 1")
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the breach as a plain dictionary."""
+        return asdict(self)
     
     def calculate_mda_restriction(self) -> float:
         """Calculate Maximum Distributable Amount restriction percentage."""
-        if not self.mda_applicable or self.shortfall_ratio <= 0:
-            return 0.0
-        
-        # MDA restrictions based on CET1 ratio shortfall
+        # MDA restrictions based on CET1 ratio shortfall bucket (_MDA_EDGES/_MDA_PCTS)
         # These are simplified rules - actual implementation may vary by jurisdiction
-        if self.buffer_type == BufferType.CONSERVATION:
-            if self.shortfall_ratio <= 0.00625:  # 0-62.5bp shortfall
-                return 1.0  # 100% restriction
-            elif self.shortfall_ratio <= 0.0125:  # 62.5-125bp shortfall
-                return 0.8  # 80% restriction
-            elif self.shortfall_ratio <= 0.01875:  # 125-187.5bp shortfall
-                return 0.6  # 60% restriction
-            elif self.shortfall_ratio <= 0.025:  # 187.5-250bp shortfall
-                return 0.4  # 40% restriction
+        if self.buffer_type is BufferType.CONSERVATION and self.mda_applicable and self.shortfall_ratio > 0:
+            return _MDA_PCTS[bisect_left(_MDA_EDGES, self.shortfall_ratio)]
         
         return 0.0
 
@@ -71,25 +88,67 @@ class RegulatoryBuffers(BaseModel):
     gsib_bucket: Optional[int] = Field(None, ge=1, le=5, description="G-SIB bucket (1-5)")
     gsib_score: Optional[float] = Field(None, ge=0, description="G-SIB indicator score")
     
+    # Buffer names, in breakdown order
+    _BUFFER_KEYS: ClassVar[Tuple[str, ...]] = (
+        "conservation", "countercyclical", "gsib", "dsib", "systemic_risk"
+    )
+    
+    # Memoised requirement totals, reset whenever a field is assigned
+    _total_buffer: Optional[float] = PrivateAttr(default=None)
+    _breakdown: Optional[Dict[str, float]] = PrivateAttr(default=None)
+    _active_items: Optional[Tuple[Tuple[str, float], ...]] = PrivateAttr(default=None)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._clear_cache()
+    
+    def _clear_cache(self) -> None:
+        self._total_buffer = None
+        self._breakdown = None
+        self._active_items = None
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "RegulatoryBuffers":
+        """Copy the buffers; the copy recomputes its requirements on first use."""
+        copied = super().model_copy(update=update, deep=deep)
+        copied._clear_cache()
+        return copied
+    
     def get_total_buffer_requirement(self) -> float:
         """Calculate total buffer requirement."""
-        return (
-            self.conservation_buffer +
-            self.countercyclical_buffer + 
-            max(self.gsib_buffer, self.dsib_buffer) +  # Take higher of G-SIB or D-SIB
-            self.systemic_risk_buffer
-        )
+        if self._total_buffer is None:
+            self._total_buffer = (
+                self.conservation_buffer +
+                self.countercyclical_buffer + 
+                max(self.gsib_buffer, self.dsib_buffer) +  # Take higher of G-SIB or D-SIB
+                self.systemic_risk_buffer
+            )
+        return self._total_buffer
     
     def get_buffer_breakdown(self) -> Dict[str, float]:
         """Get breakdown of buffer requirements."""
-        return {
-            "conservation": self.conservation_buffer,
-            "countercyclical": self.countercyclical_buffer,
-            "gsib": self.gsib_buffer,
-            "dsib": self.dsib_buffer,
-            "systemic_risk": self.systemic_risk_buffer,
-            "total": self.get_total_buffer_requirement()
-        }
+        if self._breakdown is None:
+            self._breakdown = dict(self._buffer_items())
+            self._breakdown["total"] = self.get_total_buffer_requirement()
+        return dict(self._breakdown)
+    
+    def _buffer_items(self) -> Iterator[Tuple[str, float]]:
+        """(name, rate) pairs for each buffer, without building a dict."""
+        return zip(self._BUFFER_KEYS, (
+            self.conservation_buffer,
+            self.countercyclical_buffer,
+            self.gsib_buffer,
+            self.dsib_buffer,
+            self.systemic_risk_buffer
+        ))
+    
+    def _active_buffer_items(self) -> Tuple[Tuple[str, float], ...]:
+        """(name, rate) pairs for buffers with a non-zero rate (cached)."""
+        if self._active_items is None:
+            self._active_items = tuple(
+                (name, rate) for name, rate in self._buffer_items() if rate != 0
+            )
+        return self._active_items
     
     def set_gsib_buffer_from_bucket(self, bucket: int) -> None:
         """Set G-SIB buffer based on bucket."""
@@ -111,31 +170,39 @@ class RegulatoryBuffers(BaseModel):
         if not exposures_by_country or not ccyb_rates:
             return 0.0
         
-        total_exposure = sum(exposures_by_country.values())
+        n = len(exposures_by_country)
+        exposures = np.fromiter(exposures_by_country.values(), dtype=float, count=n)
+        rates = np.fromiter((ccyb_rates.get(country, 0.0) for country in exposures_by_country),
+                            dtype=float, count=n)
+        
+        total_exposure = exposures.sum()
         if total_exposure == 0:
             return 0.0
         
-        weighted_sum = 0.0
-        for country, exposure in exposures_by_country.items():
-            ccyb_rate = ccyb_rates.get(country, 0.0)
-            weighted_sum += (exposure / total_exposure) * ccyb_rate
+        return float(np.dot(exposures, rates) / total_exposure)
+    
+    def calculate_ccyb_weighted_average_batch(self, exposures: np.ndarray,
+                                              ccyb_rates: np.ndarray) -> np.ndarray:
+        """
+        Weighted average CCyB rate for many banks at once.
         
-        return weighted_sum
+        ``exposures`` is a (banks × countries) matrix aligned with the ``ccyb_rates``
+        vector; banks with no exposure get a rate of zero.
+        """
+        exposures = np.asarray(exposures, dtype=float)
+        totals = exposures.sum(axis=1)
+        weighted = exposures @ np.asarray(ccyb_rates, dtype=float)
+        return np.divide(weighted, totals, out=np.zeros_like(weighted), where=totals != 0)
     
     def check_buffer_breaches(self, cet1_ratio: float, tier1_ratio: float, 
                             total_capital_ratio: float, total_rwa: float) -> List[BufferBreach]:
         """Check for buffer breaches and calculate restrictions."""
         breaches = []
         
-        # Minimum requirements (before buffers)
-        min_cet1 = 0.045  # 4.5%
-        min_tier1 = 0.06  # 6.0%
-        min_total = 0.08  # 8.0%
+        # Required CET1 ratio including buffers
+        required_cet1 = _MIN_CET1 + self.get_total_buffer_requirement()
         
-        # Required ratios including buffers
-        required_cet1 = min_cet1 + self.get_total_buffer_requirement()
-        required_tier1 = min_tier1 + self.get_total_buffer_requirement()
-        required_total = min_total + self.get_total_buffer_requirement()
+        has_conservation_breach = False
         
         # Check CET1 buffer breaches
         if cet1_ratio < required_cet1:
@@ -152,38 +219,113 @@ class RegulatoryBuffers(BaseModel):
             )
             breach.mda_restriction_pct = breach.calculate_mda_restriction()
             breaches.append(breach)
+            has_conservation_breach = True
         
-        # Check individual buffer breaches for detailed reporting
-        buffer_components = self.get_buffer_breakdown()
+        # Check individual buffer breaches for detailed reporting; nothing is added
+        # once a conservation breach covers them, so skip the loop in that case
+        if has_conservation_breach:
+            return breaches
         
-        for buffer_name, buffer_rate in buffer_components.items():
-            if buffer_name == "total" or buffer_rate == 0:
-                continue
-            
-            buffer_type = BufferType(buffer_name)
-            required_with_buffer = min_cet1 + buffer_rate
+        for buffer_name, buffer_rate in self._active_buffer_items():
+            required_with_buffer = _MIN_CET1 + buffer_rate
             
             if cet1_ratio < required_with_buffer:
+                buffer_type = _NAME_TO_BUFFER_TYPE[buffer_name]
                 shortfall_ratio = required_with_buffer - cet1_ratio
-                shortfall_amount = shortfall_ratio * total_rwa
                 
-                breach = BufferBreach(
+                breaches.append(BufferBreach(
                     buffer_type=buffer_type,
                     required_ratio=required_with_buffer,
                     actual_ratio=cet1_ratio,
                     shortfall_ratio=shortfall_ratio,
-                    shortfall_amount=shortfall_amount,
-                    mda_applicable=(buffer_type == BufferType.CONSERVATION)
-                )
+                    shortfall_amount=shortfall_ratio * total_rwa,
+                    mda_applicable=(buffer_type is BufferType.CONSERVATION)
+                ))
                 
-                # Only add if not already covered by main breach
-                if not any(b.buffer_type == BufferType.CONSERVATION for b in breaches):
-                    breaches.append(breach)
+                if buffer_type is BufferType.CONSERVATION:
+                    break
         
         return breaches
     
-    def get_mda_restrictions(self, breaches: List[BufferBreach]) -> Dict[str, Any]:
-        """Calculate Maximum Distributable Amount restrictions."""
+    def check_buffer_breaches_batch(self, cet1_ratios: np.ndarray,
+                                    total_rwas: np.ndarray) -> Dict[str, Any]:
+        """
+        Check CET1 buffer breaches for many banks/scenarios at once.
+        
+        Vectorised counterpart of ``check_buffer_breaches`` for the combined CET1
+        requirement. Every individual buffer is part of that requirement, so a bank
+        breaching one always breaches it and the per-buffer detail adds no rows.
+        Returns arrays aligned with the inputs, plus ``BufferBreach`` objects for
+        the breached indices only.
+        """
+        cet1_ratios = np.asarray(cet1_ratios, dtype=float)
+        total_rwas = np.broadcast_to(np.asarray(total_rwas, dtype=float), cet1_ratios.shape)
+        
+        required_cet1 = _MIN_CET1 + self.get_total_buffer_requirement()
+        shortfall_ratio = np.maximum(0.0, required_cet1 - cet1_ratios)
+        breached = shortfall_ratio > 0
+        shortfall_amount = shortfall_ratio * total_rwas
+        
+        mda_bucket = np.digitize(shortfall_ratio, _MDA_EDGES, right=True)
+        mda_restriction_pct = np.where(breached, np.asarray(_MDA_PCTS)[mda_bucket], 0.0)
+        
+        breached_idx = np.flatnonzero(breached)
+        breaches = {
+            int(i): BufferBreach(
+                buffer_type=BufferType.CONSERVATION,
+                required_ratio=required_cet1,
+                actual_ratio=float(cet1_ratios[i]),
+                shortfall_ratio=float(shortfall_ratio[i]),
+                shortfall_amount=float(shortfall_amount[i]),
+                mda_applicable=True,
+                mda_restriction_pct=float(mda_restriction_pct[i])
+            )
+            for i in breached_idx
+        }
+        
+        return {
+            "required_cet1_ratio": required_cet1,
+            "breached": breached,
+            "shortfall_ratio": shortfall_ratio,
+            "shortfall_amount": shortfall_amount,
+            "mda_restriction_pct": mda_restriction_pct,
+            "breaches": breaches,
+        }
+    
+    def simulate_batch(self, cet1_ratios: np.ndarray, total_rwas: np.ndarray) -> Dict[str, Any]:
+        """
+        Buffer impact for many (CET1 ratio, RWA) samples, e.g. Monte-Carlo sweeps.
+        
+        Runs a compiled kernel when Numba is installed and a NumPy fallback
+        otherwise. Returns per-sample shortfall ratio, MDA restriction and
+        capital shortfall arrays.
+        """
+        from ._kernels import simulate_buffers  # Imports Numba only when used
+        
+        cet1_ratios = np.ascontiguousarray(cet1_ratios, dtype=np.float64)
+        total_rwas = np.ascontiguousarray(
+            np.broadcast_to(np.asarray(total_rwas, dtype=np.float64), cet1_ratios.shape))
+        required_cet1 = _MIN_CET1 + self.get_total_buffer_requirement()
+        
+        shortfall_ratio, mda_restriction_pct, capital_shortfall = simulate_buffers(
+            cet1_ratios, total_rwas, required_cet1,
+            np.asarray(_MDA_EDGES, dtype=np.float64), np.asarray(_MDA_PCTS, dtype=np.float64)
+        )
+        
+        return {
+            "required_cet1_ratio": required_cet1,
+            "buffer_requirement": self.get_total_buffer_requirement(),
+            "shortfall_ratio": shortfall_ratio,
+            "mda_restriction_pct": mda_restriction_pct,
+            "capital_shortfall": capital_shortfall,
+        }
+    
+    def get_mda_restrictions(self, breaches: List[BufferBreach], describe: bool = True) -> Dict[str, Any]:
+        """
+        Calculate Maximum Distributable Amount restrictions.
+        
+        Pass ``describe=False`` to skip formatting the human-readable ``description``.
+        """
         if not breaches:
             return {"applicable": False, "restriction_pct": 0.0}
         
@@ -196,13 +338,18 @@ class RegulatoryBuffers(BaseModel):
                 max_restriction = breach.mda_restriction_pct
                 applicable_breach = breach
         
-        return {
+        restrictions = {
             "applicable": max_restriction > 0,
             "restriction_pct": max_restriction,
             "breach_type": applicable_breach.buffer_type if applicable_breach else None,
             "shortfall_amount": applicable_breach.shortfall_amount if applicable_breach else 0,
-            "description": f"MDA restriction of {max_restriction:.1%} due to {applicable_breach.buffer_type.value} buffer breach" if applicable_breach else "No MDA restrictions"
         }
+        if describe:
+            restrictions["description"] = (
+                f"MDA restriction of {max_restriction:.1%} due to {applicable_breach.buffer_type.value} buffer breach"
+                if applicable_breach else "No MDA restrictions"
+            )
+        return restrictions
     
     def simulate_buffer_impact(self, base_cet1_ratio: float, total_rwa: float, 
                               scenario_name: str = "base") -> Dict[str, Any]:
@@ -210,16 +357,17 @@ class RegulatoryBuffers(BaseModel):
         current_breaches = self.check_buffer_breaches(base_cet1_ratio, base_cet1_ratio, base_cet1_ratio, total_rwa)
         
         # Calculate required capital to meet all buffers
-        required_cet1_ratio = 0.045 + self.get_total_buffer_requirement()
+        total_buffer = self.get_total_buffer_requirement()
+        required_cet1_ratio = _MIN_CET1 + total_buffer
         capital_shortfall = max(0, (required_cet1_ratio - base_cet1_ratio) * total_rwa)
         
         return {
             "scenario": scenario_name,
             "current_cet1_ratio": base_cet1_ratio,
             "required_cet1_ratio": required_cet1_ratio,
-            "buffer_requirement": self.get_total_buffer_requirement(),
+            "buffer_requirement": total_buffer,
             "capital_shortfall": capital_shortfall,
             "breaches": len(current_breaches),
-            "mda_restrictions": self.get_mda_restrictions(current_breaches),
+            "mda_restrictions": self.get_mda_restrictions(current_breaches, describe=False),
             "buffer_breakdown": self.get_buffer_breakdown()
         }
@@ -1,9 +1,11 @@
 """Capital definitions and calculations for Basel Capital Engine."""
 
-from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, validator
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, asdict
+from pydantic import BaseModel, Field, PrivateAttr, validator
 from enum import Enum
-
+import math
+import numpy as np
 
 class CapitalTier(str, Enum):
     """Capital tiers according to Basel III."""
@@ -13,13 +15,22 @@ class CapitalTier(str, Enum):
     T2 = "t2"      # Tier 2
 
 
-class CapitalInstrument(BaseModel):
+# Position of each tier in per-tier arrays
+_TIER_INDEX = {tier: i for i, tier in enumerate(CapitalTier)}
+
+# Bumped on every attribute assignment to an instrument or deduction so that
+# the per-tier indices on Capital notice in-place edits
+_MUTATION_COUNT = 0
+
+
+@dataclass(slots=True)
+class CapitalInstrument:
     """Individual capital instrument."""
     
     instrument_id: str
     instrument_name: str
     tier: CapitalTier
-    amount: float = Field(gt=0, description="Amount in base currency")
+    amount: float  # Amount in base currency (> 0)
     currency: str = "EUR"
     
     # Instrument characteristics
@@ -32,6 +43,20 @@ class CapitalInstrument(BaseModel):
     phased_out_amount: Optional[float] = None  # Amount being phased out
     grandfathered: bool = False
     
+    def __post_init__(self) -> None:
+        self.amount = float(self.amount)
+        if not self.amount > 0:
+            raise ValueError("Instrument amount must be positive")
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        global _MUTATION_COUNT
+        _MUTATION_COUNT += 1
+        object.__setattr__(self, name, value)
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the instrument as a plain dictionary."""
+        return asdict(self)
+    
     def get_eligible_amount(self, reporting_date: Optional[str] = None) -> float:
         """Get amount eligible for regulatory capital."""
         eligible = self.amount
@@ -43,99 +68,152 @@ class CapitalInstrument(BaseModel):
         return max(0, eligible)
 
 
-class RegulatoryDeduction(BaseModel):
+@dataclass(slots=True)
+class RegulatoryDeduction:
     """Regulatory deductions from capital."""
     
     deduction_type: str
-    amount: float = Field(ge=0)
+    amount: float  # >= 0
     tier_applied: CapitalTier
     description: Optional[str] = None
+    
+    def __post_init__(self) -> None:
+        self.amount = float(self.amount)
+        if self.amount < 0:
+            raise ValueError("Deduction amount must be non-negative")
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        global _MUTATION_COUNT
+        _MUTATION_COUNT += 1
+        object.__setattr__(self, name, value)
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the deduction as a plain dictionary."""
+        return asdict(self)
 
 
-class CapitalComponents(BaseModel):
-    """Components of regulatory capital."""
+# Fields of CapitalComponents that may legitimately be negative
+_SIGNED_COMPONENTS = frozenset({"retained_earnings", "accumulated_oci", "cash_flow_hedge_reserve"})
+
+
+class _CapitalTotalsSlot:
+    """Holds the memoised totals slot outside the dataclass fields."""
+    
+    __slots__ = ("_totals",)
+
+
+@dataclass(slots=True)
+class CapitalComponents(_CapitalTotalsSlot):
+    """Components of regulatory capital (all amounts non-negative unless noted)."""
     
     # Common Equity Tier 1
-    common_shares: float = Field(default=0, ge=0)
-    retained_earnings: float = Field(default=0)  # Can be negative
-    accumulated_oci: float = Field(default=0)    # Accumulated other comprehensive income
-    minority_interests: float = Field(default=0, ge=0)
+    common_shares: float = 0
+    retained_earnings: float = 0  # Can be negative
+    accumulated_oci: float = 0    # Accumulated other comprehensive income (can be negative)
+    minority_interests: float = 0
     
     # Additional Tier 1
-    at1_instruments: float = Field(default=0, ge=0)
+    at1_instruments: float = 0
     
     # Tier 2
-    t2_instruments: float = Field(default=0, ge=0)
-    general_provisions: float = Field(default=0, ge=0)
+    t2_instruments: float = 0
+    general_provisions: float = 0
     
     # Regulatory adjustments and deductions
-    goodwill: float = Field(default=0, ge=0)
-    intangible_assets: float = Field(default=0, ge=0)
-    deferred_tax_assets: float = Field(default=0, ge=0)
-    cash_flow_hedge_reserve: float = Field(default=0)
-    shortfall_provisions: float = Field(default=0, ge=0)
-    securitization_exposures: float = Field(default=0, ge=0)
-    investments_in_own_shares: float = Field(default=0, ge=0)
-    reciprocal_cross_holdings: float = Field(default=0, ge=0)
-    investments_in_financial_institutions: float = Field(default=0, ge=0)
-    mortgage_servicing_rights: float = Field(default=0, ge=0)
+    goodwill: float = 0
+    intangible_assets: float = 0
+    deferred_tax_assets: float = 0
+    cash_flow_hedge_reserve: float = 0  # Can be negative
+    shortfall_provisions: float = 0
+    securitization_exposures: float = 0
+    investments_in_own_shares: float = 0
+    reciprocal_cross_holdings: float = 0
+    investments_in_financial_institutions: float = 0
+    mortgage_servicing_rights: float = 0
     
     # Threshold deductions
-    significant_investments_threshold: float = Field(default=0, ge=0)
-    dta_threshold: float = Field(default=0, ge=0)
-    mortgage_servicing_threshold: float = Field(default=0, ge=0)
+    significant_investments_threshold: float = 0
+    dta_threshold: float = 0
+    mortgage_servicing_threshold: float = 0
+    
+    def __post_init__(self) -> None:
+        for name in self.__dataclass_fields__:
+            value = float(getattr(self, name))
+            if value < 0 and name not in _SIGNED_COMPONENTS:
+                raise ValueError(f"{name} must be non-negative")
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_totals", None)
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the components as a plain dictionary."""
+        return asdict(self)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "_totals":
+            object.__setattr__(self, "_totals", None)
+    
+    def _compute_all(self) -> Tuple[float, float, float, float, float]:
+        """
+        Compute (CET1 before adjustments, CET1 adjustments, CET1, Tier 1, total
+        capital) in a single pass over the fields; cached until a field changes.
+        """
+        # Pydantic can build instances without calling __init__, leaving the slot unset
+        totals = getattr(self, "_totals", None)
+        if totals is not None:
+            return totals
+        
+        cet1_before = math.fsum((
+            self.common_shares,
+            self.retained_earnings,
+            self.accumulated_oci,
+            self.minority_interests,
+        ))
+        
+        adjustments = math.fsum((
+            # Full deductions
+            self.goodwill,
+            self.intangible_assets,
+            self.investments_in_own_shares,
+            self.reciprocal_cross_holdings,
+            self.shortfall_provisions,
+            self.securitization_exposures,
+            # Threshold deductions (amounts above 10% individually or 15% in aggregate)
+            self.significant_investments_threshold,
+            self.dta_threshold,
+            self.mortgage_servicing_threshold,
+            # Cash flow hedge reserve (add back if negative, deduct if positive)
+            max(0.0, self.cash_flow_hedge_reserve),
+        ))
+        
+        cet1 = max(0, cet1_before - adjustments)
+        tier1 = cet1 + self.at1_instruments
+        
+        # Tier 2 is limited to 100% of Tier 1
+        eligible_t2 = min(self.t2_instruments + self.general_provisions, tier1)
+        
+        self._totals = (cet1_before, adjustments, cet1, tier1, tier1 + eligible_t2)
+        return self._totals
     
     def calculate_cet1_before_adjustments(self) -> float:
         """Calculate CET1 before regulatory adjustments."""
-        return (
-            self.common_shares +
-            self.retained_earnings + 
-            self.accumulated_oci +
-            self.minority_interests
-        )
+        return self._compute_all()[0]
     
     def calculate_cet1_adjustments(self) -> float:
         """Calculate total CET1 regulatory adjustments (deductions)."""
-        # Full deductions
-        full_deductions = (
-            self.goodwill +
-            self.intangible_assets +
-            self.investments_in_own_shares +
-            self.reciprocal_cross_holdings +
-            self.shortfall_provisions +
-            self.securitization_exposures
-        )
-        
-        # Threshold deductions (amounts above 10% individually or 15% in aggregate)
-        threshold_deductions = (
-            self.significant_investments_threshold +
-            self.dta_threshold + 
-            self.mortgage_servicing_threshold
-        )
-        
-        # Cash flow hedge reserve (add back if negative, deduct if positive)
-        hedge_adjustment = max(0, self.cash_flow_hedge_reserve)
-        
-        return full_deductions + threshold_deductions + hedge_adjustment
+        return self._compute_all()[1]
     
     def calculate_cet1(self) -> float:
         """Calculate final CET1 capital."""
-        cet1_before = self.calculate_cet1_before_adjustments()
-        adjustments = self.calculate_cet1_adjustments()
-        return max(0, cet1_before - adjustments)
+        return self._compute_all()[2]
     
     def calculate_tier1(self) -> float:
         """Calculate Tier 1 capital (CET1 + AT1)."""
-        return self.calculate_cet1() + self.at1_instruments
+        return self._compute_all()[3]
     
     def calculate_total_capital(self) -> float:
         """Calculate total regulatory capital."""
-        tier1 = self.calculate_tier1()
-        
-        # Tier 2 is limited to 100% of Tier 1
-        eligible_t2 = min(self.t2_instruments + self.general_provisions, tier1)
-        
-        return tier1 + eligible_t2
+        return self._compute_all()[4]
 
 
 class Capital(BaseModel):
@@ -154,31 +232,85 @@ class Capital(BaseModel):
     # Regulatory deductions (detailed view)
     deductions: List[RegulatoryDeduction] = Field(default_factory=list)
     
+    # Per-tier indices: (state key they were built for, items by tier, amount by tier).
+    # Rebuilt lazily when a list is replaced or edited, or an item is modified.
+    _instrument_index: Optional[Tuple[Tuple[int, Tuple[int, ...]], Dict[CapitalTier, List[CapitalInstrument]],
+                                      Dict[CapitalTier, float]]] = PrivateAttr(default=None)
+    _deduction_index: Optional[Tuple[Tuple[int, Tuple[int, ...]], Dict[CapitalTier, List[RegulatoryDeduction]],
+                                     Dict[CapitalTier, float]]] = PrivateAttr(default=None)
+    
+    @staticmethod
+    def _index_key(items: List[Any]) -> Tuple[int, Tuple[int, ...]]:
+        """Identify the current contents of an instrument or deduction list."""
+        return (_MUTATION_COUNT, tuple(map(id, items)))
+    
+    def _instrument_tier_index(self) -> Tuple[Dict[CapitalTier, List[CapitalInstrument]],
+                                              Dict[CapitalTier, float]]:
+        """Instruments and eligible amounts grouped by tier."""
+        key = self._index_key(self.instruments)
+        if self._instrument_index is None or self._instrument_index[0] != key:
+            n = len(self.instruments)
+            by_tier = {tier: [] for tier in CapitalTier}
+            tier_codes = np.empty(n, dtype=np.intp)
+            amount = np.empty(n)
+            phased_out = np.empty(n)
+            for i, inst in enumerate(self.instruments):
+                by_tier[inst.tier].append(inst)
+                tier_codes[i] = _TIER_INDEX[inst.tier]
+                amount[i] = inst.amount
+                phased_out[i] = inst.phased_out_amount or 0.0
+            
+            # Eligible amount per instrument (see get_eligible_amount), summed by tier
+            eligible = np.maximum(0.0, amount - phased_out)
+            totals = np.bincount(tier_codes, weights=eligible, minlength=len(_TIER_INDEX))
+            amounts = {tier: float(totals[i]) for tier, i in _TIER_INDEX.items()}
+            self._instrument_index = (key, by_tier, amounts)
+        return self._instrument_index[1], self._instrument_index[2]
+    
+    def _deduction_tier_index(self) -> Tuple[Dict[CapitalTier, List[RegulatoryDeduction]],
+                                             Dict[CapitalTier, float]]:
+        """Deductions and deducted amounts grouped by tier."""
+        key = self._index_key(self.deductions)
+        if self._deduction_index is None or self._deduction_index[0] != key:
+            by_tier = {tier: [] for tier in CapitalTier}
+            amounts = dict.fromkeys(CapitalTier, 0.0)
+            for ded in self.deductions:
+                by_tier[ded.tier_applied].append(ded)
+                amounts[ded.tier_applied] += ded.amount
+            self._deduction_index = (key, by_tier, amounts)
+        return self._deduction_index[1], self._deduction_index[2]
+    
     def add_instrument(self, instrument: CapitalInstrument) -> None:
         """Add a capital instrument."""
+        by_tier, amounts = self._instrument_tier_index()
         self.instruments.append(instrument)
+        by_tier[instrument.tier].append(instrument)
+        amounts[instrument.tier] += instrument.get_eligible_amount()
+        self._instrument_index = (self._index_key(self.instruments), by_tier, amounts)
     
     def add_deduction(self, deduction: RegulatoryDeduction) -> None:
         """Add a regulatory deduction."""
+        by_tier, amounts = self._deduction_tier_index()
         self.deductions.append(deduction)
+        by_tier[deduction.tier_applied].append(deduction)
+        amounts[deduction.tier_applied] += deduction.amount
+        self._deduction_index = (self._index_key(self.deductions), by_tier, amounts)
     
     def get_instruments_by_tier(self, tier: CapitalTier) -> List[CapitalInstrument]:
         """Get all instruments of a specific tier."""
-        return [inst for inst in self.instruments if inst.tier == tier]
+        return list(self._instrument_tier_index()[0][tier])
     
     def get_total_instrument_amount(self, tier: CapitalTier) -> float:
         """Get total amount of instruments for a specific tier."""
-        instruments = self.get_instruments_by_tier(tier)
-        return sum(inst.get_eligible_amount() for inst in instruments)
+        return self._instrument_tier_index()[1][tier]
     
     def get_deductions_by_tier(self, tier: CapitalTier) -> List[RegulatoryDeduction]:
         """Get all deductions applied to a specific tier."""
-        return [ded for ded in self.deductions if ded.tier_applied == tier]
+        return list(self._deduction_tier_index()[0][tier])
     
     def get_total_deduction_amount(self, tier: CapitalTier) -> float:
         """Get total deduction amount for a specific tier."""
-        deductions = self.get_deductions_by_tier(tier)
-        return sum(ded.amount for ded in deductions)
+        return self._deduction_tier_index()[1][tier]
     
     def calculate_cet1_capital(self) -> float:
         """Calculate CET1 capital."""
@@ -194,9 +326,7 @@ class Capital(BaseModel):
     
     def get_capital_summary(self) -> Dict[str, Any]:
         """Get summary of capital calculations."""
-        cet1 = self.calculate_cet1_capital()
-        tier1 = self.calculate_tier1_capital()
-        total = self.calculate_total_capital()
+        cet1_before, adjustments, cet1, tier1, total = self.components._compute_all()
         
         return {
             "cet1_capital": cet1,
@@ -204,8 +334,8 @@ class Capital(BaseModel):
             "tier1_capital": tier1,
             "tier2_capital": total - tier1,
             "total_capital": total,
-            "cet1_before_adjustments": self.components.calculate_cet1_before_adjustments(),
-            "cet1_adjustments": self.components.calculate_cet1_adjustments(),
+            "cet1_before_adjustments": cet1_before,
+            "cet1_adjustments": adjustments,
             "instrument_breakdown": {
                 "cet1_instruments": self.get_total_instrument_amount(CapitalTier.CET1),
                 "at1_instruments": self.get_total_instrument_amount(CapitalTier.AT1),
@@ -222,9 +352,7 @@ class Capital(BaseModel):
         """Validate capital structure and return list of issues."""
         issues = []
         
-        cet1 = self.calculate_cet1_capital()
-        tier1 = self.calculate_tier1_capital()
-        total = self.calculate_total_capital()
+        _, _, cet1, tier1, total = self.components._compute_all()
         
         # Basic validations
         if cet1 < 0:
@@ -1,75 +1,216 @@
 """Configuration management for Basel Capital Engine."""
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+import numpy as np
 import yaml
-from pydantic import BaseModel, Field
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
 
-class BaselConfig(BaseModel):
-    """Basel Capital Engine configuration."""
-    
-    risk_weights: Dict[str, Any] = Field(default_factory=dict)
-    buffers: Dict[str, Any] = Field(default_factory=dict) 
-    minimum_ratios: Dict[str, float] = Field(default_factory=dict)
-    crm: Dict[str, Any] = Field(default_factory=dict)
-    operational_risk: Dict[str, Any] = Field(default_factory=dict)
-    stress_scenarios: Dict[str, Any] = Field(default_factory=dict)
-    correlations: Dict[str, Any] = Field(default_factory=dict)
-    validation: Dict[str, Any] = Field(default_factory=dict)
+
+# Top-level configuration sections, in file order
+_SECTIONS = (
+    "risk_weights",
+    "buffers",
+    "minimum_ratios",
+    "crm",
+    "operational_risk",
+    "stress_scenarios",
+    "correlations",
+    "validation",
+)
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of a parsed YAML value: mappings become proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable deep copy of a (possibly frozen) YAML value."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class BaselConfig:
+    """
+    Basel Capital Engine configuration.
+    
+    A plain container for the YAML sections; the hot lookups (risk weights, buffers,
+    minimum ratios) are served from flat tables built when a section is assigned.
+    Call ``refresh()`` after mutating a section dictionary in place.
+    
+    ``load_default()`` returns a shared, frozen instance whose sections are read-only
+    mappings; use ``model_copy()`` or ``load_from_file`` for a configuration that
+    will be modified.
+    """
+    
+    risk_weights: Dict[str, Any]
+    buffers: Dict[str, Any]
+    minimum_ratios: Dict[str, float]
+    crm: Dict[str, Any]
+    operational_risk: Dict[str, Any]
+    stress_scenarios: Dict[str, Any]
+    correlations: Dict[str, Any]
+    validation: Dict[str, Any]
+    
+    def __init__(self,
+                 risk_weights: Optional[Dict[str, Any]] = None,
+                 buffers: Optional[Dict[str, Any]] = None,
+                 minimum_ratios: Optional[Dict[str, float]] = None,
+                 crm: Optional[Dict[str, Any]] = None,
+                 operational_risk: Optional[Dict[str, Any]] = None,
+                 stress_scenarios: Optional[Dict[str, Any]] = None,
+                 correlations: Optional[Dict[str, Any]] = None,
+                 validation: Optional[Dict[str, Any]] = None):
+        """Initialize configuration from section dictionaries."""
+        object.__setattr__(self, "risk_weights", risk_weights or {})
+        object.__setattr__(self, "buffers", buffers or {})
+        object.__setattr__(self, "minimum_ratios", minimum_ratios or {})
+        object.__setattr__(self, "crm", crm or {})
+        object.__setattr__(self, "operational_risk", operational_risk or {})
+        object.__setattr__(self, "stress_scenarios", stress_scenarios or {})
+        object.__setattr__(self, "correlations", correlations or {})
+        object.__setattr__(self, "validation", validation or {})
+        object.__setattr__(self, "_frozen", False)
+        self.refresh()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f"Cannot set {name!r}: the default {self.__class__.__name__} is shared and frozen")
+        object.__setattr__(self, name, value)
+        if name in _SECTIONS:
+            self.refresh()
+    
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Frozen sections are mapping proxies, which cannot be pickled; rebuild from plain copies
+        return (self.__class__, tuple(_thaw(getattr(self, name)) for name in _SECTIONS))
+    
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(sections={[name for name in _SECTIONS if getattr(self, name)]})"
+    
+    def refresh(self) -> None:
+        """Rebuild the flattened lookup tables from the section dictionaries."""
+        credit_weights = dict(self.risk_weights.get("credit", {}))
+        object.__setattr__(self, "_credit_weights", credit_weights)
+        object.__setattr__(self, "_risk_weights_default", credit_weights.get("other_assets", 1.25))
+        # Memoised (asset_class, rating) -> weight, filled on first lookup
+        object.__setattr__(self, "_risk_weights_flat", {})
+        
+        buffers_flat: Dict[Tuple[str, Optional[str]], float] = {
+            ("conservation", None): self.buffers.get("conservation", 0.025),
+            ("countercyclical", None): self.buffers.get("countercyclical", 0.0),
+        }
+        sifi_buffers = self.buffers.get("sifi") or {}
+        for bucket, rate in sifi_buffers.items():
+            buffers_flat[("sifi", bucket)] = rate
+        # Requests without a bucket resolve to the D-SIB rate
+        buffers_flat[("sifi", None)] = sifi_buffers.get("d_sib", 0.01)
+        object.__setattr__(self, "_buffers_flat", buffers_flat)
+        
+        object.__setattr__(self, "_min_ratios", dict(self.minimum_ratios))
+        object.__setattr__(self, "_fingerprint", None)
+        
+        validation = self.validation
+        object.__setattr__(self, "_validation_limits", (
+            validation.get("max_exposure_single", float("inf")),
+            validation.get("min_pd", 0.0001),
+            validation.get("max_pd", 0.99),
+            validation.get("min_lgd", 0.01),
+            validation.get("max_lgd", 1.0),
+            validation.get("min_maturity", 0.003),
+            validation.get("max_maturity", 50),
+        ))
+    
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the configuration sections, computed on first use after a refresh."""
+        if self._fingerprint is None:
+            payload = json.dumps(self.model_dump(), sort_keys=True, default=str)
+            object.__setattr__(self, "_fingerprint", hashlib.blake2b(payload.encode(), digest_size=16).hexdigest())
+        return self._fingerprint
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return a mutable copy of the configuration sections as a dictionary."""
+        return {name: _thaw(getattr(self, name)) for name in _SECTIONS}
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = True) -> "BaselConfig":
+        """
+        Return an independent, unfrozen copy, optionally replacing whole sections.
+        
+        Sections are always copied deeply so the copy never shares state with a
+        frozen default; ``deep`` is accepted for compatibility.
+        """
+        sections = self.model_dump()
+        sections.update(update or {})
+        return self.__class__(**sections)
     
     @classmethod
     def load_default(cls) -> "BaselConfig":
-        """Load default configuration from package yaml file."""
-        config_path = Path(__file__).parent.parent / "config.yaml"
-        return cls.load_from_file(config_path)
+        """Load default configuration from package yaml file (parsed once, shared)."""
+        return _load_default_config()
+    
+    @classmethod
+    def reload_default(cls) -> "BaselConfig":
+        """Discard the cached default configuration and parse it again."""
+        _load_default_config.cache_clear()
+        return _load_default_config()
     
     @classmethod
     def load_from_file(cls, config_path: Path) -> "BaselConfig":
         """Load configuration from YAML file."""
         with open(config_path, "r", encoding="utf-8") as f:
-            config_data = yaml.safe_load(f)
-        return cls(**config_data)
+            config_data = yaml.load(f.read(), Loader=_Loader) or {}
+        return cls(**{name: config_data[name] for name in _SECTIONS if name in config_data})
     
     def save_to_file(self, config_path: Path) -> None:
         """Save configuration to YAML file."""
         with open(config_path, "w", encoding="utf-8") as f:
-            yaml.dump(self.model_dump(), f, default_flow_style=False, indent=2)
+            f.write(yaml.dump(self.model_dump(), Dumper=_Dumper, default_flow_style=False, indent=2))
     
     def get_risk_weight(self, asset_class: str, rating: Optional[str] = None) -> float:
         """Get risk weight for specific asset class and rating."""
-        credit_weights = self.risk_weights.get("credit", {})
+        key = (asset_class, rating)
+        weight = self._risk_weights_flat.get(key)
+        if weight is not None:
+            return weight
         
+        credit_weights = self._credit_weights
+        weight = None
         if rating:
-            key = f"{asset_class}_{rating.lower()}"
-            if key in credit_weights:
-                return credit_weights[key]
+            weight = credit_weights.get(f"{asset_class}_{rating.lower()}")
         
-        # Fallback to asset class default
-        if asset_class in credit_weights:
-            return credit_weights[asset_class]
+        # Fallback to asset class default, then other assets
+        if weight is None:
+            weight = credit_weights.get(asset_class, self._risk_weights_default)
         
-        # Ultimate fallback
-        return credit_weights.get("other_assets", 1.25)
+        self._risk_weights_flat[key] = weight
+        return weight
     
     def get_buffer_requirement(self, buffer_type: str, **kwargs: Any) -> float:
         """Get buffer requirement for specific type."""
-        buffers = self.buffers
-        
-        if buffer_type == "conservation":
-            return buffers.get("conservation", 0.025)
-        elif buffer_type == "countercyclical":
-            return buffers.get("countercyclical", 0.0)
-        elif buffer_type == "sifi":
-            sifi_buffers = buffers.get("sifi", {})
-            bucket = kwargs.get("bucket", "d_sib")
-            return sifi_buffers.get(bucket, 0.01)
-        
-        return 0.0
+        if buffer_type == "sifi":
+            return self._buffers_flat.get(("sifi", kwargs.get("bucket")), 0.01)
+        return self._buffers_flat.get((buffer_type, None), 0.0)
     
     def get_minimum_ratio(self, ratio_type: str) -> float:
         """Get minimum required ratio."""
-        return self.minimum_ratios.get(ratio_type, 0.08)
+        return self._min_ratios.get(ratio_type, 0.08)
     
     def get_stress_scenario(self, scenario_name: str) -> Dict[str, Any]:
         """Get stress scenario parameters."""
@@ -77,28 +218,33 @@ class BaselConfig(BaseModel):
     
     def validate_exposure_data(self, exposure_amount: float, pd: float, lgd: float, maturity: float) -> bool:
         """Validate exposure data against configured limits."""
-        validation = self.validation
-        
-        # Check exposure limits
-        if exposure_amount > validation.get("max_exposure_single", float("inf")):
-            return False
-        
-        # Check PD bounds
-        min_pd = validation.get("min_pd", 0.0001)
-        max_pd = validation.get("max_pd", 0.99)
-        if not (min_pd <= pd <= max_pd):
-            return False
-        
-        # Check LGD bounds  
-        min_lgd = validation.get("min_lgd", 0.01)
-        max_lgd = validation.get("max_lgd", 1.0)
-        if not (min_lgd <= lgd <= max_lgd):
-            return False
-        
-        # Check maturity bounds
-        min_maturity = validation.get("min_maturity", 0.003)
-        max_maturity = validation.get("max_maturity", 50)
-        if not (min_maturity <= maturity <= max_maturity):
-            return False
+        max_exposure, min_pd, max_pd, min_lgd, max_lgd, min_maturity, max_maturity = self._validation_limits
+        return (
+            exposure_amount <= max_exposure
+            and min_pd <= pd <= max_pd
+            and min_lgd <= lgd <= max_lgd
+            and min_maturity <= maturity <= max_maturity
+        )
+    
+    def validate_batch(self, data: np.ndarray) -> np.ndarray:
+        """
+        Validate many exposures at once.
         
-        return True
+        ``data`` has one row per exposure and columns (exposure_amount, pd, lgd,
+        maturity); returns a boolean mask of rows within the configured limits.
+        """
+        data = np.asarray(data, dtype=float)
+        max_exposure, min_pd, max_pd, min_lgd, max_lgd, min_maturity, max_maturity = self._validation_limits
+        lower = np.array([-np.inf, min_pd, min_lgd, min_maturity])
+        upper = np.array([max_exposure, max_pd, max_lgd, max_maturity])
+        return np.all((data >= lower) & (data <= upper), axis=1)
+
+
+@lru_cache(maxsize=1)
+def _load_default_config() -> BaselConfig:
+    """Parse the packaged config.yaml once and freeze the result."""
+    config = BaselConfig.load_from_file(Path(__file__).parent.parent / "config.yaml")
+    for name in _SECTIONS:
+        object.__setattr__(config, name, _freeze(getattr(config, name)))
+    object.__setattr__(config, "_frozen", True)
+    return config
@@ -1,12 +1,17 @@
 """Main Basel Capital Engine coordinating all calculations."""
 
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import repeat
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from pydantic import BaseModel
 import logging
+import numpy as np
 
 from .config import BaselConfig
 from .capital import Capital
-from .exposure import Portfolio
+from .exposure import Portfolio, EXPOSURE_TYPES
 from .buffers import RegulatoryBuffers, BufferBreach
 from ..metrics.ratios import CapitalRatios, LeverageRatio
 from ..rwa.credit import CreditRiskCalculator
@@ -16,6 +21,9 @@ from ..rwa.operational import OperationalRiskCalculator
 
 logger = logging.getLogger(__name__)
 
+# Number of (portfolio, config) RWA results kept by each engine
+RWA_CACHE_SIZE = 128
+
 
 class BaselResults(BaseModel):
     """Complete results from Basel capital calculations."""
@@ -93,26 +101,80 @@ class BaselResults(BaseModel):
 class BaselEngine:
     """Main engine for Basel III capital calculations."""
     
-    def __init__(self, config: Optional[BaselConfig] = None):
-        """Initialize Basel engine with configuration."""
+    def __init__(self, config: Optional[BaselConfig] = None, max_workers: int = 4):
+        """
+        Initialize Basel engine with configuration.
+        
+        The credit, market and operational calculators are independent, so they
+        run on a pool of ``max_workers`` threads; pass ``max_workers=1`` to run
+        them sequentially in the calling thread.
+        """
         self.config = config or BaselConfig.load_default()
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        # RWA totals keyed by (portfolio fingerprint, config fingerprint), least recent first
+        self._rwa_cache: "OrderedDict[Tuple[str, str], Dict[str, float]]" = OrderedDict()
         
         # Initialize risk calculators
         self.credit_calculator = CreditRiskCalculator(self.config)
         self.market_calculator = MarketRiskCalculator(self.config)
         self.operational_calculator = OperationalRiskCalculator(self.config)
         
+        # Compile the array kernels now rather than inside the first calculation
+        from ._kernels import warm_up
+        warm_up()
+        
         logger.info("Basel Capital Engine initialized")
     
+    def __getstate__(self) -> Dict[str, Any]:
+        # Thread pools cannot be pickled and caches stay local to each process
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_rwa_cache"] = OrderedDict()
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._max_workers > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
+    
+    def close(self) -> None:
+        """Shut down the calculation thread pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def _run_concurrently(self, portfolio: Portfolio,
+                          *functions: Callable[[Portfolio], Any]) -> List[Any]:
+        """Apply independent calculations to a portfolio and return their results in order."""
+        if self._pool is None:
+            return [function(portfolio) for function in functions]
+        
+        # Build the shared columnar view once, before the workers read it
+        portfolio.to_arrays()
+        futures = [self._pool.submit(function, portfolio) for function in functions]
+        return [future.result() for future in futures]
+    
     def calculate_all_metrics(self, portfolio: Portfolio, capital: Capital, 
                             buffers: Optional[RegulatoryBuffers] = None) -> BaselResults:
         """Calculate all Basel metrics for a portfolio."""
         logger.info(f"Calculating Basel metrics for portfolio {portfolio.portfolio_id}")
         
         # Calculate RWAs
-        credit_rwa = self.credit_calculator.calculate_total_rwa(portfolio)
-        market_rwa = self.market_calculator.calculate_total_rwa(portfolio)
-        operational_rwa = self.operational_calculator.calculate_rwa(portfolio)
+        rwa = self.calculate_rwa_only(portfolio)
+        credit_rwa = rwa["credit_rwa"]
+        market_rwa = rwa["market_rwa"]
+        operational_rwa = rwa["operational_rwa"]
+        
+        # Leverage exposure and RWA breakdowns
+        leverage_calculator = LeverageRatio(self.config)
+        leverage_results, credit_details, market_details, operational_details = self._run_concurrently(
+            portfolio,
+            partial(leverage_calculator.calculate, capital=capital),
+            self.credit_calculator.get_detailed_breakdown,
+            self.market_calculator.get_detailed_breakdown,
+            self.operational_calculator.get_detailed_breakdown,
+        )
         
         total_rwa = credit_rwa + market_rwa + operational_rwa
         
@@ -126,10 +188,6 @@ class BaselEngine:
         tier1_ratio = tier1_capital / total_rwa if total_rwa > 0 else 0
         basel_ratio = total_capital / total_rwa if total_rwa > 0 else 0
         
-        # Calculate leverage ratio
-        leverage_calculator = LeverageRatio(self.config)
-        leverage_results = leverage_calculator.calculate(portfolio, capital)
-        
         # Buffer analysis
         if buffers is None:
             buffers = RegulatoryBuffers()
@@ -143,15 +201,15 @@ class BaselEngine:
         rwa_breakdown = {
             "credit": {
                 "total": credit_rwa,
-                "details": self.credit_calculator.get_detailed_breakdown(portfolio)
+                "details": credit_details
             },
             "market": {
                 "total": market_rwa,
-                "details": self.market_calculator.get_detailed_breakdown(portfolio)
+                "details": market_details
             },
             "operational": {
                 "total": operational_rwa,
-                "details": self.operational_calculator.get_detailed_breakdown(portfolio)
+                "details": operational_details
             }
         }
         
@@ -176,18 +234,60 @@ class BaselEngine:
             bank_name=portfolio.bank_name,
         )
     
+    def run_scenarios(self, portfolios: List[Portfolio], capitals: List[Capital],
+                      buffers: Optional[RegulatoryBuffers] = None,
+                      n_workers: Optional[int] = None) -> List[BaselResults]:
+        """
+        Calculate all metrics for independent (portfolio, capital) scenarios.
+        
+        Scenarios run in this process by default, sharing the RWA cache. Pass
+        ``n_workers > 1`` to spread them over a process pool; each worker gets its
+        own copy of the engine with an empty cache.
+        """
+        if len(portfolios) != len(capitals):
+            raise ValueError("Each scenario needs one portfolio and one capital structure")
+        
+        n_workers = max(1, n_workers or 1)
+        if n_workers == 1 or len(portfolios) < 2:
+            return [self.calculate_all_metrics(portfolio, capital, buffers)
+                    for portfolio, capital in zip(portfolios, capitals)]
+        
+        chunksize = -(-len(portfolios) // n_workers)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(self.calculate_all_metrics, portfolios, capitals,
+                                     repeat(buffers), chunksize=chunksize))
+    
     def calculate_rwa_only(self, portfolio: Portfolio) -> Dict[str, float]:
-        """Calculate only RWA components."""
-        credit_rwa = self.credit_calculator.calculate_total_rwa(portfolio)
-        market_rwa = self.market_calculator.calculate_total_rwa(portfolio)
-        operational_rwa = self.operational_calculator.calculate_rwa(portfolio)
+        """
+        Calculate only RWA components.
         
-        return {
+        Results are cached per portfolio and configuration content, so repeated
+        runs over an unchanged portfolio (e.g. varying only capital or buffers)
+        skip the RWA calculators.
+        """
+        key = (portfolio.fingerprint, self.config.fingerprint)
+        rwa = self._rwa_cache.get(key)
+        if rwa is not None:
+            self._rwa_cache.move_to_end(key)
+            return dict(rwa)
+        
+        credit_rwa, market_rwa, operational_rwa = self._run_concurrently(
+            portfolio,
+            self.credit_calculator.calculate_total_rwa,
+            self.market_calculator.calculate_total_rwa,
+            self.operational_calculator.calculate_rwa,
+        )
+        
+        rwa = {
             "credit_rwa": credit_rwa,
             "market_rwa": market_rwa,
             "operational_rwa": operational_rwa,
             "total_rwa": credit_rwa + market_rwa + operational_rwa
         }
+        self._rwa_cache[key] = rwa
+        if len(self._rwa_cache) > RWA_CACHE_SIZE:
+            self._rwa_cache.popitem(last=False)
+        return dict(rwa)
     
     def calculate_capital_ratios(self, capital: Capital, total_rwa: float) -> CapitalRatios:
         """Calculate capital ratios given capital and RWA."""
@@ -207,19 +307,24 @@ class BaselEngine:
             issues.append("Portfolio has zero or negative total exposure")
         
         # Validate individual exposures
-        for i, exposure in enumerate(portfolio.exposures):
-            if exposure.current_exposure <= 0:
+        arrays = portfolio.to_arrays()
+        non_positive = arrays.current_exposure <= 0
+        
+        # Validate credit risk parameters if present
+        lgd = arrays.loss_given_default
+        has_pd = ~np.isnan(arrays.probability_of_default)
+        invalid_parameters = has_pd & ~self.config.validate_batch(np.column_stack([
+            arrays.current_exposure,
+            arrays.probability_of_default,
+            np.where(np.isnan(lgd) | (lgd == 0), 0.45, lgd),  # Default LGD
+            np.nan_to_num(arrays.maturity, nan=2.5)  # Default maturity
+        ]))
+        
+        for i in np.flatnonzero(non_positive | invalid_parameters).tolist():
+            if non_positive[i]:
                 issues.append(f"Exposure {i} has zero or negative amount")
-            
-            # Validate credit risk parameters if present
-            if exposure.probability_of_default is not None:
-                if not self.config.validate_exposure_data(
-                    exposure.current_exposure,
-                    exposure.probability_of_default,
-                    exposure.loss_given_default or 0.45,  # Default LGD
-                    exposure.maturity or 2.5  # Default maturity
-                ):
-                    issues.append(f"Exposure {i} has invalid risk parameters")
+            if invalid_parameters[i]:
+                issues.append(f"Exposure {i} has invalid risk parameters")
         
         # Validate capital
         capital_issues = capital.validate_capital_structure()
@@ -251,18 +356,24 @@ class BaselEngine:
     
     def _get_exposure_type_breakdown(self, portfolio: Portfolio) -> Dict[str, float]:
         """Get breakdown of exposures by type."""
-        breakdown = {}
-        for exposure in portfolio.exposures:
-            exp_type = exposure.exposure_type.value
-            breakdown[exp_type] = breakdown.get(exp_type, 0) + exposure.current_exposure
-        return breakdown
+        arrays = portfolio.to_arrays()
+        counts = np.bincount(arrays.exposure_type, minlength=len(EXPOSURE_TYPES))
+        totals = np.bincount(arrays.exposure_type, weights=arrays.current_exposure,
+                             minlength=len(EXPOSURE_TYPES))
+        return {
+            exp_type.value: float(total)
+            for exp_type, count, total in zip(EXPOSURE_TYPES, counts, totals)
+            if count
+        }
     
     def _get_rating_distribution(self, portfolio: Portfolio) -> Dict[str, int]:
         """Get distribution of exposures by rating."""
+        arrays = portfolio.to_arrays()
+        labels = arrays.external_ratings + ("unrated",)
         distribution = {}
-        for exposure in portfolio.exposures:
-            rating = exposure.external_rating or "unrated"
-            distribution[rating] = distribution.get(rating, 0) + 1
+        for code, count in zip(*np.unique(arrays.external_rating, return_counts=True)):
+            rating = labels[code]
+            distribution[rating] = distribution.get(rating, 0) + int(count)
         return distribution
     
     def compare_approaches(self, portfolio: Portfolio) -> Dict[str, Any]:
@@ -1,11 +1,18 @@
 """Exposure definitions and calculations for Basel Capital Engine."""
 
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from operator import attrgetter
+import hashlib
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from decimal import Decimal
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 import numpy as np
 
+# Bumped on every attribute assignment to an Exposure or its CRM so that
+# cached portfolio columns notice in-place edits
+_MUTATION_COUNT = 0
+
 
 class ExposureType(str, Enum):
     """Types of exposures for regulatory capital calculations."""
@@ -47,6 +54,18 @@ class ExposureClass(str, Enum):
     COMMODITY = "commodity"
 
 
+# Integer codes used for the enum columns of PortfolioArrays
+EXPOSURE_TYPES: Tuple[ExposureType, ...] = tuple(ExposureType)
+EXPOSURE_CLASSES: Tuple[ExposureClass, ...] = tuple(ExposureClass)
+_EXPOSURE_TYPE_CODES = {member: code for code, member in enumerate(EXPOSURE_TYPES)}
+_EXPOSURE_CLASS_CODES = {member: code for code, member in enumerate(EXPOSURE_CLASSES)}
+
+_TRADING_TYPE_CODES = np.array([_EXPOSURE_TYPE_CODES[ExposureType.TRADING_SECURITIES],
+                                _EXPOSURE_TYPE_CODES[ExposureType.TRADING_DERIVATIVES]], dtype=np.int8)
+_CCF_TYPE_CODES = np.array([_EXPOSURE_TYPE_CODES[ExposureType.COMMITMENTS],
+                            _EXPOSURE_TYPE_CODES[ExposureType.GUARANTEES]], dtype=np.int8)
+
+
 class CreditRiskMitigation(BaseModel):
     """Credit risk mitigation techniques."""
     
@@ -56,6 +75,11 @@ class CreditRiskMitigation(BaseModel):
     guarantee_amount: Optional[float] = None
     netting_agreement: bool = False
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        global _MUTATION_COUNT
+        _MUTATION_COUNT += 1
+        super().__setattr__(name, value)
+    
     def get_haircut(self, config: "BaselConfig") -> float:
         """Calculate haircut for collateral."""
         if not self.collateral_type:
@@ -125,6 +149,11 @@ class Exposure(BaseModel):
             raise ValueError("LGD must be between 1% and 100%")
         return v
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        global _MUTATION_COUNT
+        _MUTATION_COUNT += 1
+        super().__setattr__(name, value)
+    
     def get_exposure_at_default(self) -> float:
         """Calculate Exposure at Default (EAD)."""
         if self.exposure_type in [ExposureType.COMMITMENTS, ExposureType.GUARANTEES]:
@@ -165,81 +194,271 @@ class Exposure(BaseModel):
         ]
 
 
+# Per-exposure fields read by PortfolioArrays.from_exposures, in column order
+_ROW_GETTER = attrgetter(
+    "current_exposure", "exposure_type", "exposure_class",
+    "probability_of_default", "loss_given_default", "maturity", "credit_conversion_factor",
+    "counterparty_id", "sector", "external_rating", "crm",
+)
+
+
+def _intern(values: Iterable[Optional[str]], count: int) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Encode optional strings as int32 codes; missing or empty values map to -1."""
+    lut: Dict[str, int] = {}
+    codes = np.fromiter(
+        (lut.setdefault(value, len(lut)) if value else -1 for value in values),
+        dtype=np.int32, count=count
+    )
+    return codes, tuple(lut)
+
+
+def _optional_floats(values: Iterable[Optional[float]], count: int) -> np.ndarray:
+    """Float64 column with NaN standing in for ``None``."""
+    return np.fromiter((np.nan if value is None else value for value in values),
+                       dtype=np.float64, count=count)
+
+
+@dataclass
+class PortfolioArrays:
+    """
+    Struct-of-arrays view of a portfolio, one element per exposure.
+    
+    Enum columns hold int8 codes into ``EXPOSURE_TYPES``/``EXPOSURE_CLASSES``; string
+    columns hold int32 codes into the matching label tuple, with -1 for missing values.
+    Optional numeric fields are NaN where the exposure leaves them unset.
+    """
+    
+    current_exposure: np.ndarray
+    exposure_type: np.ndarray
+    exposure_class: np.ndarray
+    probability_of_default: np.ndarray
+    loss_given_default: np.ndarray
+    maturity: np.ndarray
+    credit_conversion_factor: np.ndarray
+    collateral_value: np.ndarray
+    counterparty_id: np.ndarray
+    counterparty_ids: Tuple[str, ...]
+    sector: np.ndarray
+    sectors: Tuple[str, ...]
+    external_rating: np.ndarray
+    external_ratings: Tuple[str, ...]
+    collateral_type: np.ndarray
+    collateral_types: Tuple[str, ...]
+    
+    def __post_init__(self) -> None:
+        for value in vars(self).values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+    
+    def __len__(self) -> int:
+        return self.current_exposure.shape[0]
+    
+    @classmethod
+    def from_exposures(cls, exposures: List[Exposure]) -> "PortfolioArrays":
+        """Materialise the columns from a list of exposures in one pass per field."""
+        n = len(exposures)
+        (current, exposure_types, exposure_classes, pds, lgds, maturities, ccfs,
+         counterparties, sectors, ratings, crms) = zip(*map(_ROW_GETTER, exposures)) if n else ((),) * 11
+        collaterals = [(crm.collateral_value, crm.collateral_type) if crm else (None, None) for crm in crms]
+        collateral_values = [value for value, _ in collaterals]
+        collateral_types = [kind for _, kind in collaterals]
+        
+        counterparty_codes, counterparty_labels = _intern(counterparties, n)
+        sector_codes, sector_labels = _intern(sectors, n)
+        rating_codes, rating_labels = _intern(ratings, n)
+        collateral_codes, collateral_labels = _intern(collateral_types, n)
+        
+        return cls(
+            current_exposure=np.fromiter(current, dtype=np.float64, count=n),
+            exposure_type=np.fromiter(map(_EXPOSURE_TYPE_CODES.__getitem__, exposure_types), dtype=np.int8, count=n),
+            exposure_class=np.fromiter(map(_EXPOSURE_CLASS_CODES.__getitem__, exposure_classes), dtype=np.int8, count=n),
+            probability_of_default=_optional_floats(pds, n),
+            loss_given_default=_optional_floats(lgds, n),
+            maturity=_optional_floats(maturities, n),
+            credit_conversion_factor=_optional_floats(ccfs, n),
+            collateral_value=_optional_floats(collateral_values, n),
+            counterparty_id=counterparty_codes,
+            counterparty_ids=counterparty_labels,
+            sector=sector_codes,
+            sectors=sector_labels,
+            external_rating=rating_codes,
+            external_ratings=rating_labels,
+            collateral_type=collateral_codes,
+            collateral_types=collateral_labels,
+        )
+    
+    @property
+    def trading_book(self) -> np.ndarray:
+        """Boolean mask of trading book exposures."""
+        return np.isin(self.exposure_type, _TRADING_TYPE_CODES)
+    
+    def exposure_at_default(self) -> np.ndarray:
+        """EAD per exposure, applying the CCF to commitments and guarantees."""
+        ccf = np.nan_to_num(self.credit_conversion_factor, nan=0.0)
+        return np.where(np.isin(self.exposure_type, _CCF_TYPE_CODES),
+                        self.current_exposure * ccf, self.current_exposure)
+    
+    def group_sum(self, codes: np.ndarray, labels: Tuple[str, ...],
+                  weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sum ``weights`` (default: current exposure) per label, ignoring missing codes."""
+        if weights is None:
+            weights = self.current_exposure
+        present = codes >= 0
+        return np.bincount(codes[present], weights=weights[present], minlength=len(labels))
+
+
 class Portfolio(BaseModel):
-    """Collection of exposures representing a bank's portfolio."""
+    """
+    Collection of exposures representing a bank's portfolio.
+    
+    Aggregations run on a cached ``PortfolioArrays`` view (see ``to_arrays()``)
+    that is rebuilt when exposures are added or edited. Call ``invalidate_cache()``
+    after replacing an element of ``exposures`` in place.
+    """
     
     portfolio_id: str
     bank_name: Optional[str] = None
     reporting_date: Optional[str] = None
     exposures: List[Exposure] = Field(default_factory=list)
     
+    _arrays: Optional[PortfolioArrays] = PrivateAttr(default=None)
+    _arrays_key: Optional[Tuple[int, int, int]] = PrivateAttr(default=None)
+    _fingerprint: Optional[str] = PrivateAttr(default=None)
+    
     def add_exposure(self, exposure: Exposure) -> None:
         """Add an exposure to the portfolio."""
         self.exposures.append(exposure)
     
+    def invalidate_cache(self) -> None:
+        """Drop the cached columnar view."""
+        self._arrays = None
+        self._arrays_key = None
+        self._fingerprint = None
+    
+    def to_arrays(self) -> PortfolioArrays:
+        """
+        Columnar view of the exposures, rebuilt only when they have changed.
+        
+        The view is shared between callers, so its arrays are read-only.
+        """
+        key = (id(self.exposures), len(self.exposures), _MUTATION_COUNT)
+        if self._arrays is None or self._arrays_key != key:
+            self._arrays = PortfolioArrays.from_exposures(self.exposures)
+            self._arrays_key = key
+            self._fingerprint = None
+        return self._arrays
+    
+    @property
+    def fingerprint(self) -> str:
+        """
+        Content hash of the exposure data read by the RWA calculators.
+        
+        Covers every column of ``to_arrays()`` plus the full trading book records,
+        whose sensitivities and market values feed market risk. Recomputed when the
+        columnar view is rebuilt.
+        """
+        arrays = self.to_arrays()
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(str(len(arrays)).encode(), digest_size=16)
+            for value in vars(arrays).values():
+                digest.update(value.tobytes() if isinstance(value, np.ndarray) else repr(value).encode())
+            for i in np.flatnonzero(arrays.trading_book).tolist():
+                digest.update(self.exposures[i].model_dump_json().encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+    
+    def _select(self, mask: np.ndarray) -> List[Exposure]:
+        exposures = self.exposures
+        return [exposures[i] for i in np.flatnonzero(mask)]
+    
+    def to_lazyframe(self) -> "pl.LazyFrame":
+        """
+        Return the exposures as a Polars LazyFrame.
+        
+        Requires the optional ``polars`` dependency (``basileia-engine[performance]``).
+        """
+        try:
+            import polars as pl
+        except ImportError as e:
+            raise ImportError("to_lazyframe() requires polars: pip install basileia-engine[performance]") from e
+        
+        arrays = self.to_arrays()
+        
+        def decode(codes: np.ndarray, labels: Tuple[str, ...]) -> "pl.Series":
+            return pl.Series(np.array(labels + (None,), dtype=object)[codes].tolist(), dtype=pl.Utf8)
+        
+        return pl.LazyFrame({
+            "exposure_id": [exp.exposure_id for exp in self.exposures],
+            "counterparty_id": decode(arrays.counterparty_id, arrays.counterparty_ids),
+            "exposure_type": decode(arrays.exposure_type, tuple(t.value for t in EXPOSURE_TYPES)),
+            "exposure_class": decode(arrays.exposure_class, tuple(c.value for c in EXPOSURE_CLASSES)),
+            "current_exposure": arrays.current_exposure,
+            "exposure_at_default": arrays.exposure_at_default(),
+            "probability_of_default": arrays.probability_of_default,
+            "loss_given_default": arrays.loss_given_default,
+            "maturity": arrays.maturity,
+            "credit_conversion_factor": arrays.credit_conversion_factor,
+            "external_rating": decode(arrays.external_rating, arrays.external_ratings),
+            "sector": decode(arrays.sector, arrays.sectors),
+            "collateral_type": decode(arrays.collateral_type, arrays.collateral_types),
+            "collateral_value": arrays.collateral_value,
+        }).with_columns(pl.col(pl.Float64).fill_nan(None))
+    
     def get_total_exposure(self) -> float:
         """Get total exposure amount."""
-        return sum(exp.current_exposure for exp in self.exposures)
+        # Left-to-right summation keeps the result identical to summing the exposures
+        return float(sum(self.to_arrays().current_exposure.tolist()))
     
     def get_exposures_by_class(self, exposure_class: ExposureClass) -> List[Exposure]:
         """Get all exposures of a specific class."""
-        return [exp for exp in self.exposures if exp.exposure_class == exposure_class]
+        return self._select(self.to_arrays().exposure_class == _EXPOSURE_CLASS_CODES[ExposureClass(exposure_class)])
     
     def get_exposures_by_type(self, exposure_type: ExposureType) -> List[Exposure]:
         """Get all exposures of a specific type."""
-        return [exp for exp in self.exposures if exp.exposure_type == exposure_type]
+        return self._select(self.to_arrays().exposure_type == _EXPOSURE_TYPE_CODES[ExposureType(exposure_type)])
     
     def get_trading_book_exposures(self) -> List[Exposure]:
         """Get all trading book exposures."""
-        return [exp for exp in self.exposures if exp.is_trading_book()]
+        return self._select(self.to_arrays().trading_book)
     
     def get_banking_book_exposures(self) -> List[Exposure]:
         """Get all banking book exposures."""
-        return [exp for exp in self.exposures if not exp.is_trading_book()]
+        return self._select(~self.to_arrays().trading_book)
     
     def get_concentration_metrics(self) -> Dict[str, Any]:
         """Calculate portfolio concentration metrics."""
         if not self.exposures:
             return {}
         
+        arrays = self.to_arrays()
         total_exposure = self.get_total_exposure()
         
-        # Concentration by counterparty
-        counterparty_exposures = {}
-        for exp in self.exposures:
-            if exp.counterparty_id:
-                counterparty_exposures[exp.counterparty_id] = (
-                    counterparty_exposures.get(exp.counterparty_id, 0) + exp.current_exposure
-                )
-        
-        # Concentration by sector
-        sector_exposures = {}
-        for exp in self.exposures:
-            if exp.sector:
-                sector_exposures[exp.sector] = (
-                    sector_exposures.get(exp.sector, 0) + exp.current_exposure
-                )
+        # Concentration by counterparty and by sector
+        counterparty_exposures = arrays.group_sum(arrays.counterparty_id, arrays.counterparty_ids)
+        sector_exposures = arrays.group_sum(arrays.sector, arrays.sectors)
         
         # Calculate concentration ratios
-        largest_counterparty = max(counterparty_exposures.values()) if counterparty_exposures else 0
-        largest_sector = max(sector_exposures.values()) if sector_exposures else 0
+        largest_counterparty = counterparty_exposures.max() if counterparty_exposures.size else 0
+        largest_sector = sector_exposures.max() if sector_exposures.size else 0
         
         return {
             "total_exposure": total_exposure,
             "num_exposures": len(self.exposures),
-            "largest_counterparty_pct": largest_counterparty / total_exposure if total_exposure > 0 else 0,
-            "largest_sector_pct": largest_sector / total_exposure if total_exposure > 0 else 0,
-            "counterparty_hhi": self._calculate_hhi(list(counterparty_exposures.values())),
-            "sector_hhi": self._calculate_hhi(list(sector_exposures.values())),
+            "largest_counterparty_pct": float(largest_counterparty / total_exposure) if total_exposure > 0 else 0,
+            "largest_sector_pct": float(largest_sector / total_exposure) if total_exposure > 0 else 0,
+            "counterparty_hhi": self._calculate_hhi(counterparty_exposures),
+            "sector_hhi": self._calculate_hhi(sector_exposures),
         }
     
-    def _calculate_hhi(self, exposures: List[float]) -> float:
+    def _calculate_hhi(self, exposures: np.ndarray) -> float:
         """Calculate Herfindahl-Hirschman Index for concentration."""
-        if not exposures:
+        exposures = np.asarray(exposures, dtype=np.float64)
+        if not exposures.size:
             return 0.0
         
-        total = sum(exposures)
+        total = exposures.sum()
         if total == 0:
             return 0.0
         
-        return sum((exp / total) ** 2 for exp in exposures)
+        shares = exposures / total
+        return float(np.dot(shares, shares))
@@ -3,9 +3,15 @@
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Default annual growth assumptions used by generate_capital_plan
+RWA_GROWTH = 0.10
+CAPITAL_GROWTH = 0.05
+MINIMUM_CAPITAL_RATIO = 0.08
+
 
 class CapitalPlanningEngine:
     """Engine for capital planning and projections."""
@@ -20,31 +26,70 @@ class CapitalPlanningEngine:
         """Generate forward-looking capital plan."""
         
         # Simplified capital planning logic
-        projections = {}
+        years = np.arange(1, planning_horizon + 1)
+        projected = self._project(
+            current_capital, current_rwa,
+            np.power(1 + CAPITAL_GROWTH, years),  # 5% annual growth
+            np.power(1 + RWA_GROWTH, years)  # 10% annual growth
+        )
         
-        for year in range(1, planning_horizon + 1):
-            projected_rwa = current_rwa * (1.1 ** year)  # 10% annual growth
-            projected_capital = current_capital * (1.05 ** year)  # 5% annual growth
-            
-            projections[f"year_{year}"] = {
-                'projected_rwa': projected_rwa,
-                'projected_capital': projected_capital,
-                'capital_ratio': projected_capital / projected_rwa,
-                'surplus_deficit': projected_capital - (projected_rwa * 0.08)
+        projections = {
+            f"year_{year}": {
+                'projected_rwa': rwa,
+                'projected_capital': capital,
+                'capital_ratio': ratio,
+                'surplus_deficit': surplus
             }
+            for year, rwa, capital, ratio, surplus in zip(
+                years.tolist(),
+                projected['projected_rwa'].tolist(),
+                projected['projected_capital'].tolist(),
+                projected['capital_ratio'].tolist(),
+                projected['surplus_deficit'].tolist()
+            )
+        }
         
         return {
             'projections': projections,
-            'recommendations': self._generate_recommendations(projections)
+            'recommendations': self._generate_recommendations(projected['capital_ratio'])
         }
     
-    def _generate_recommendations(self, projections: Dict) -> List[str]:
-        """Generate capital management recommendations."""
+    def project_scenarios(self, current_capital: float,
+                          current_rwa: float,
+                          capital_growth: np.ndarray,
+                          rwa_growth: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Project capital and RWA under many growth paths at once.
         
-        recommendations = []
+        ``capital_growth`` and ``rwa_growth`` hold annual growth rates of shape
+        (scenarios, years); every returned array has the same shape, so a
+        Monte Carlo fan is projected without a Python loop.
+        """
+        capital_growth = np.asarray(capital_growth, dtype=np.float64)
+        rwa_growth = np.asarray(rwa_growth, dtype=np.float64)
+        if capital_growth.ndim != 2 or capital_growth.shape != rwa_growth.shape:
+            raise ValueError("Growth paths must be 2-D arrays of the same (scenarios, years) shape")
         
-        for year, data in projections.items():
-            if data['capital_ratio'] < 0.08:
-                recommendations.append(f"Capital shortfall expected in {year}")
+        return self._project(
+            current_capital, current_rwa,
+            np.cumprod(1 + capital_growth, axis=1),
+            np.cumprod(1 + rwa_growth, axis=1)
+        )
+    
+    def _project(self, current_capital: float, current_rwa: float,
+                 capital_factors: np.ndarray, rwa_factors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Apply cumulative growth factors to the current capital and RWA."""
+        projected_rwa = current_rwa * rwa_factors
+        projected_capital = current_capital * capital_factors
+        return {
+            'projected_rwa': projected_rwa,
+            'projected_capital': projected_capital,
+            'capital_ratio': projected_capital / projected_rwa,
+            'surplus_deficit': projected_capital - (projected_rwa * MINIMUM_CAPITAL_RATIO)
+        }
+    
+    def _generate_recommendations(self, capital_ratios: np.ndarray) -> List[str]:
+        """Generate capital management recommendations."""
         
-        return recommendations
+        shortfall_years = np.flatnonzero(capital_ratios < MINIMUM_CAPITAL_RATIO) + 1
+        return [f"Capital shortfall expected in year_{year}" for year in shortfall_years.tolist()]
@@ -1,8 +1,10 @@
 """Liquidity Coverage Ratio (LCR) calculation for Basel III liquidity framework."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Union
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
 from enum import Enum
+import numpy as np
 import logging
 
 from ..core.config import BaselConfig
@@ -18,6 +20,125 @@ class HQLACategory(str, Enum):
     LEVEL_2B = "level_2b"    # 25-50% haircut (lower-rated corporate bonds, equities)
 
 
+# HQLA levels in array index order (category codes used by LiquidAssetBatch)
+HQLA_LEVELS = (HQLACategory.LEVEL_1, HQLACategory.LEVEL_2A, HQLACategory.LEVEL_2B)
+_HQLA_LEVEL_INDEX = {category: i for i, category in enumerate(HQLA_LEVELS)}
+
+# Outflow/inflow reporting buckets in array index order (bucket codes used by CashFlowBatch)
+OUTFLOW_BUCKETS = (
+    'retail_deposits',
+    'small_business_deposits',
+    'operational_deposits',
+    'non_operational_deposits',
+    'unsecured_wholesale',
+    'secured_funding',
+    'additional_requirements',
+    'credit_facilities',
+    'liquidity_facilities',
+    'other',
+)
+INFLOW_BUCKETS = (
+    'secured_lending',
+    'unsecured_lending',
+    'operational_inflows',
+    'other',
+)
+_OUTFLOW_INDEX = {name: i for i, name in enumerate(OUTFLOW_BUCKETS)}
+_INFLOW_INDEX = {name: i for i, name in enumerate(INFLOW_BUCKETS)}
+
+# Default runoff rates by counterparty type, used when a flow has no runoff rate
+_DEFAULT_RUNOFF_BY_COUNTERPARTY = {
+    'retail_stable': 0.05,
+    'retail_less_stable': 0.10,
+    'small_business_stable': 0.05,
+    'small_business_less_stable': 0.10,
+    'operational': 0.25,
+    'non_operational': 1.00,
+    'wholesale_unsecured': 1.00,
+    'wholesale_secured': 0.00
+}
+
+
+def _categorize_outflow(counterparty_type: str, item_type: str,
+                        secured: bool, operational: bool) -> str:
+    """Map an outflow's attributes to its reporting bucket."""
+    counterparty = counterparty_type.lower()
+    
+    if 'retail' in counterparty:
+        return 'retail_deposits'
+    elif 'small_business' in counterparty:
+        return 'small_business_deposits'
+    elif operational:
+        return 'operational_deposits'
+    elif 'wholesale' in counterparty:
+        if secured:
+            return 'secured_funding'
+        else:
+            return 'unsecured_wholesale'
+    elif 'credit_facility' in item_type.lower():
+        return 'credit_facilities'
+    elif 'liquidity_facility' in item_type.lower():
+        return 'liquidity_facilities'
+    else:
+        return 'other'
+
+
+def _categorize_inflow(secured: bool, operational: bool) -> str:
+    """Map an inflow's attributes to its reporting bucket."""
+    if secured:
+        return 'secured_lending'
+    elif operational:
+        return 'operational_inflows'
+    else:
+        return 'unsecured_lending'
+
+
+def _as_bool_array(values: Optional[Sequence[bool]], n: int) -> np.ndarray:
+    """Convert an optional flag column to a boolean array of length n."""
+    if values is None:
+        return np.zeros(n, dtype=bool)
+    return np.asarray(values, dtype=bool)
+
+
+@dataclass
+class LiquidAssetBatch:
+    """Struct-of-arrays view of liquid assets for vectorized HQLA calculation.
+    
+    Built with ``LiquidAsset.from_arrays``; rows are not validated individually.
+    As for lists of assets, haircuts come from the calculator's per-level table.
+    """
+    
+    asset_ids: np.ndarray
+    asset_types: np.ndarray
+    market_value: np.ndarray     # float64
+    category: np.ndarray         # int8 index into HQLA_LEVELS
+    encumbered: np.ndarray       # bool
+    
+    def __len__(self) -> int:
+        return len(self.market_value)
+
+
+@dataclass
+class CashFlowBatch:
+    """Struct-of-arrays view of cash flows for vectorized LCR calculation.
+    
+    Built with ``CashFlowItem.from_arrays``; reporting buckets and default
+    runoff rates are resolved once at construction time.
+    """
+    
+    item_ids: np.ndarray
+    is_outflow: np.ndarray       # bool
+    is_inflow: np.ndarray        # bool
+    amount: np.ndarray           # float64
+    runoff_rate: np.ndarray      # float64
+    default_runoff: np.ndarray   # float64, counterparty default runoff rate
+    bucket: np.ndarray           # int8 index into OUTFLOW_BUCKETS / INFLOW_BUCKETS
+    maturity_days: np.ndarray    # int64
+    
+    def __len__(self) -> int:
+        return len(self.amount)
+
+
 class LiquidAsset(BaseModel):
     """Individual liquid asset for HQLA calculation."""
     
@@ -28,6 +149,26 @@ class LiquidAsset(BaseModel):
     haircut_rate: float = Field(ge=0, le=1)
     encumbered: bool = False
     central_bank_eligible: bool = False
+    
+    @classmethod
+    def from_arrays(cls, asset_ids: Sequence[str], asset_types: Sequence[str],
+                    market_values: Sequence[float],
+                    hqla_categories: Sequence[Union[HQLACategory, str]],
+                    encumbered: Optional[Sequence[bool]] = None) -> LiquidAssetBatch:
+        """Build a LiquidAssetBatch from column arrays without per-row validation."""
+        market_value = np.asarray(market_values, dtype=np.float64)
+        category = np.fromiter(
+            (_HQLA_LEVEL_INDEX[HQLACategory(c)] for c in hqla_categories),
+            dtype=np.int8, count=len(market_value)
+        )
+        
+        return LiquidAssetBatch(
+            asset_ids=np.asarray(asset_ids, dtype=object),
+            asset_types=np.asarray(asset_types, dtype=object),
+            market_value=market_value,
+            category=category,
+            encumbered=_as_bool_array(encumbered, len(market_value))
+        )
 
 
 class CashFlowItem(BaseModel):
@@ -41,6 +182,63 @@ class CashFlowItem(BaseModel):
     maturity_days: int = Field(ge=0, le=30)  # Within 30 days
     secured: bool = False
     operational: bool = False
+    
+    @classmethod
+    def from_arrays(cls, item_ids: Sequence[str], item_types: Sequence[str],
+                    counterparty_types: Sequence[str], amounts: Sequence[float],
+                    runoff_rates: Sequence[float],
+                    maturity_days: Optional[Sequence[int]] = None,
+                    secured: Optional[Sequence[bool]] = None,
+                    operational: Optional[Sequence[bool]] = None) -> CashFlowBatch:
+        """Build a CashFlowBatch from column arrays without per-row validation."""
+        amount = np.asarray(amounts, dtype=np.float64)
+        n = len(amount)
+        secured_arr = _as_bool_array(secured, n)
+        operational_arr = _as_bool_array(operational, n)
+        item_type_arr = np.asarray(item_types, dtype=object)
+        
+        is_outflow = item_type_arr == 'outflow'
+        is_inflow = item_type_arr == 'inflow'
+        
+        # Bucket and default runoff depend only on (counterparty type, item type,
+        # secured, operational): resolve each distinct combination once
+        counterparty_labels, counterparty_codes = np.unique(
+            np.asarray(counterparty_types, dtype=str), return_inverse=True)
+        item_type_labels, item_type_codes = np.unique(item_type_arr.astype(str), return_inverse=True)
+        keys = np.stack([counterparty_codes.ravel(), item_type_codes.ravel(),
+                         secured_arr, operational_arr], axis=1).astype(np.int64)
+        combinations, inverse = np.unique(keys, axis=0, return_inverse=True)
+        
+        combination_bucket = np.empty(len(combinations), dtype=np.int8)
+        combination_runoff = np.empty(len(combinations), dtype=np.float64)
+        for j, (cp_code, type_code, is_secured, is_operational) in enumerate(combinations.tolist()):
+            counterparty_type = str(counterparty_labels[cp_code])
+            item_type = str(item_type_labels[type_code])
+            if item_type == 'outflow':
+                combination_bucket[j] = _OUTFLOW_INDEX[_categorize_outflow(
+                    counterparty_type, item_type, bool(is_secured), bool(is_operational)
+                )]
+            else:
+                combination_bucket[j] = _INFLOW_INDEX[_categorize_inflow(
+                    bool(is_secured), bool(is_operational)
+                )]
+            combination_runoff[j] = _DEFAULT_RUNOFF_BY_COUNTERPARTY.get(counterparty_type, 1.00)
+        
+        inverse = inverse.ravel()
+        bucket = combination_bucket[inverse]
+        default_runoff = combination_runoff[inverse]
+        
+        return CashFlowBatch(
+            item_ids=np.asarray(item_ids, dtype=object),
+            is_outflow=is_outflow,
+            is_inflow=is_inflow,
+            amount=amount,
+            runoff_rate=np.asarray(runoff_rates, dtype=np.float64),
+            default_runoff=default_runoff,
+            bucket=bucket,
+            maturity_days=(np.zeros(n, dtype=np.int64) if maturity_days is None
+                           else np.asarray(maturity_days, dtype=np.int64))
+        )
 
 
 class LCRResult(BaseModel):
@@ -103,19 +301,30 @@ class LCRCalculator:
             HQLACategory.LEVEL_2B: 0.25  # Can be up to 0.50 for some assets
         }
     
-    def calculate_lcr(self, liquid_assets: List[LiquidAsset], 
-                      cash_flows: List[CashFlowItem],
+    def calculate_lcr(self, liquid_assets: Union[List[LiquidAsset], LiquidAssetBatch], 
+                      cash_flows: Union[List[CashFlowItem], CashFlowBatch],
                       calculation_date: str = None) -> LCRResult:
-        """Calculate LCR for given assets and cash flows."""
+        """Calculate LCR for given assets and cash flows.
+        
+        Accepts either lists of LiquidAsset/CashFlowItem or the struct-of-arrays
+        batches built by ``LiquidAsset.from_arrays``/``CashFlowItem.from_arrays``.
+        """
         
         self.logger.info("Calculating LCR")
         
         # Calculate HQLA
-        hqla_result = self._calculate_hqla(liquid_assets)
+        if isinstance(liquid_assets, LiquidAssetBatch):
+            hqla_result = self._calculate_hqla_batch(liquid_assets)
+        else:
+            hqla_result = self._calculate_hqla(liquid_assets)
         
         # Calculate cash outflows and inflows
-        outflows = self._calculate_cash_outflows(cash_flows)
-        inflows = self._calculate_cash_inflows(cash_flows)
+        if isinstance(cash_flows, CashFlowBatch):
+            outflows = self._calculate_cash_outflows_batch(cash_flows)
+            inflows = self._calculate_cash_inflows_batch(cash_flows)
+        else:
+            outflows = self._calculate_cash_outflows(cash_flows)
+            inflows = self._calculate_cash_inflows(cash_flows)
         
         # Net cash outflows (inflows capped at 75% of outflows)
         capped_inflows = min(inflows['total'], 0.75 * outflows['total'])
@@ -145,14 +354,9 @@ class LCRCalculator:
     def _calculate_hqla(self, assets: List[LiquidAsset]) -> Dict[str, float]:
         """Calculate High Quality Liquid Assets."""
         
-        hqla_breakdown = {
-            'level_1': 0.0,
-            'level_2a': 0.0,
-            'level_2b': 0.0,
-            'total': 0.0
-        }
-        
-        level_2_total = 0.0
+        level_1 = 0.0
+        level_2a = 0.0
+        level_2b = 0.0
         
         for asset in assets:
             if asset.encumbered:
@@ -163,13 +367,43 @@ class LCRCalculator:
             hqla_value = asset.market_value * (1 - haircut)
             
             if asset.hqla_category == HQLACategory.LEVEL_1:
-                hqla_breakdown['level_1'] += hqla_value
+                level_1 += hqla_value
             elif asset.hqla_category == HQLACategory.LEVEL_2A:
-                hqla_breakdown['level_2a'] += hqla_value
-                level_2_total += hqla_value
+                level_2a += hqla_value
             elif asset.hqla_category == HQLACategory.LEVEL_2B:
-                hqla_breakdown['level_2b'] += hqla_value
-                level_2_total += hqla_value
+                level_2b += hqla_value
+        
+        hqla_breakdown = self._apply_hqla_caps(level_1, level_2a, level_2b)
+        
+        self.logger.debug(f"HQLA calculated: {hqla_breakdown}")
+        return hqla_breakdown
+    
+    def _calculate_hqla_batch(self, assets: LiquidAssetBatch) -> Dict[str, float]:
+        """Calculate High Quality Liquid Assets from a struct-of-arrays batch."""
+        
+        # Unencumbered market value per level, then one haircut per level
+        unencumbered_value = np.where(assets.encumbered, 0.0, assets.market_value)
+        level_values = np.bincount(assets.category, weights=unencumbered_value,
+                                   minlength=len(HQLA_LEVELS))
+        level_weights = np.array([1.0 - self.hqla_haircuts.get(c, 0.0) for c in HQLA_LEVELS])
+        level_1, level_2a, level_2b = (level_values * level_weights).tolist()
+        
+        hqla_breakdown = self._apply_hqla_caps(level_1, level_2a, level_2b)
+        
+        self.logger.debug(f"HQLA calculated: {hqla_breakdown}")
+        return hqla_breakdown
+    
+    def _apply_hqla_caps(self, level_1: float, level_2a: float, level_2b: float) -> Dict[str, float]:
+        """Apply Level 2 and Level 2B caps to post-haircut HQLA amounts."""
+        
+        hqla_breakdown = {
+            'level_1': level_1,
+            'level_2a': level_2a,
+            'level_2b': level_2b,
+            'total': 0.0
+        }
+        
+        level_2_total = level_2a + level_2b
         
         # Apply Level 2 caps
         # Level 2 assets cannot exceed 40% of total HQLA
@@ -193,7 +427,6 @@ class LCRCalculator:
         
         hqla_breakdown['total'] = hqla_breakdown['level_1'] + level_2_total
         
-        self.logger.debug(f"HQLA calculated: {hqla_breakdown}")
         return hqla_breakdown
     
     def _calculate_cash_outflows(self, cash_flows: List[CashFlowItem]) -> Dict[str, float]:
@@ -264,53 +497,47 @@ class LCRCalculator:
         self.logger.debug(f"Cash inflows calculated: {inflow_breakdown}")
         return inflow_breakdown
     
-    def _get_default_runoff_rate(self, flow: CashFlowItem) -> float:
-        """Get default runoff rate based on counterparty type."""
+    def _calculate_cash_outflows_batch(self, cash_flows: CashFlowBatch) -> Dict[str, float]:
+        """Calculate 30-day cash outflows from a struct-of-arrays batch."""
         
-        # Map counterparty types to runoff rates
-        runoff_mapping = {
-            'retail_stable': 0.05,
-            'retail_less_stable': 0.10,
-            'small_business_stable': 0.05,
-            'small_business_less_stable': 0.10,
-            'operational': 0.25,
-            'non_operational': 1.00,
-            'wholesale_unsecured': 1.00,
-            'wholesale_secured': 0.00
-        }
+        mask = cash_flows.is_outflow
+        runoff = cash_flows.runoff_rate[mask]
+        runoff = np.where(runoff > 0, runoff, cash_flows.default_runoff[mask])
+        totals = np.bincount(cash_flows.bucket[mask], weights=cash_flows.amount[mask] * runoff,
+                             minlength=len(OUTFLOW_BUCKETS))
+        
+        outflow_breakdown = dict(zip(OUTFLOW_BUCKETS, totals.tolist()))
+        outflow_breakdown['total'] = float(totals.sum())
+        
+        self.logger.debug(f"Cash outflows calculated: {outflow_breakdown}")
+        return outflow_breakdown
+    
+    def _calculate_cash_inflows_batch(self, cash_flows: CashFlowBatch) -> Dict[str, float]:
+        """Calculate 30-day cash inflows from a struct-of-arrays batch."""
+        
+        mask = cash_flows.is_inflow
+        inflow_amount = cash_flows.amount[mask] * (1.0 - cash_flows.runoff_rate[mask])
+        totals = np.bincount(cash_flows.bucket[mask], weights=inflow_amount,
+                             minlength=len(INFLOW_BUCKETS))
+        
+        inflow_breakdown = dict(zip(INFLOW_BUCKETS, totals.tolist()))
+        inflow_breakdown['total'] = float(totals.sum())
         
-        return runoff_mapping.get(flow.counterparty_type, 1.00)  # Default to 100%
+        self.logger.debug(f"Cash inflows calculated: {inflow_breakdown}")
+        return inflow_breakdown
+    
+    def _get_default_runoff_rate(self, flow: CashFlowItem) -> float:
+        """Get default runoff rate based on counterparty type."""
+        return _DEFAULT_RUNOFF_BY_COUNTERPARTY.get(flow.counterparty_type, 1.00)  # Default to 100%
     
     def _categorize_outflow(self, flow: CashFlowItem) -> str:
         """Categorize cash outflow for reporting."""
-        
-        if 'retail' in flow.counterparty_type.lower():
-            return 'retail_deposits'
-        elif 'small_business' in flow.counterparty_type.lower():
-            return 'small_business_deposits'
-        elif flow.operational:
-            return 'operational_deposits'
-        elif 'wholesale' in flow.counterparty_type.lower():
-            if flow.secured:
-                return 'secured_funding'
-            else:
-                return 'unsecured_wholesale'
-        elif 'credit_facility' in flow.item_type.lower():
-            return 'credit_facilities'
-        elif 'liquidity_facility' in flow.item_type.lower():
-            return 'liquidity_facilities'
-        else:
-            return 'other'
+        return _categorize_outflow(flow.counterparty_type, flow.item_type,
+                                   flow.secured, flow.operational)
     
     def _categorize_inflow(self, flow: CashFlowItem) -> str:
         """Categorize cash inflow for reporting."""
-        
-        if flow.secured:
-            return 'secured_lending'
-        elif flow.operational:
-            return 'operational_inflows'
-        else:
-            return 'unsecured_lending'
+        return _categorize_inflow(flow.secured, flow.operational)
     
     def stress_test_lcr(self, base_result: LCRResult, stress_scenarios: Dict[str, Dict]) -> Dict[str, LCRResult]:
         """Apply stress scenarios to LCR calculation."""
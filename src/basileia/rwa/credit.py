@@ -4,12 +4,20 @@ from typing import Dict, Any, List, Optional
 from enum import Enum
 import math
 import logging
+import numpy as np
 
 from ..core.config import BaselConfig
-from ..core.exposure import Portfolio, Exposure, ExposureClass
+from ..core.exposure import Portfolio, PortfolioArrays, Exposure, ExposureClass, EXPOSURE_CLASSES
 
 logger = logging.getLogger(__name__)
 
+# Exposure class codes (see PortfolioArrays) that use the retail IRB formula
+_RETAIL_CLASS_CODES = np.array([
+    EXPOSURE_CLASSES.index(ExposureClass.RETAIL_MORTGAGE),
+    EXPOSURE_CLASSES.index(ExposureClass.RETAIL_REVOLVING),
+    EXPOSURE_CLASSES.index(ExposureClass.RETAIL_OTHER),
+], dtype=np.int8)
+
 
 class CreditApproach(str, Enum):
     """Credit risk calculation approaches."""
@@ -37,19 +45,52 @@ class CreditRiskCalculator:
     
     def calculate_standardized_rwa(self, portfolio: Portfolio) -> float:
         """Calculate RWA using Standardized Approach."""
-        total_rwa = 0.0
+        arrays = portfolio.to_arrays()
         
-        for exposure in portfolio.get_banking_book_exposures():
-            # Skip trading book exposures for credit risk
-            if exposure.is_trading_book():
-                continue
-            
-            rwa = self._calculate_exposure_sa_rwa(exposure)
-            total_rwa += rwa
+        # Skip trading book exposures for credit risk
+        banking_book = ~arrays.trading_book
+        ead = self._sa_exposure_at_default(arrays)[banking_book]
+        risk_weights = self._sa_risk_weights(arrays)[banking_book]
+        total_rwa = float(np.dot(ead, risk_weights))
             
         logger.info(f"Calculated Standardized Approach Credit RWA: {total_rwa:,.0f}")
         return total_rwa
     
+    def _sa_exposure_at_default(self, arrays: PortfolioArrays) -> np.ndarray:
+        """EAD after credit risk mitigation for every exposure in the portfolio."""
+        haircuts = self.config.crm.get("haircuts", {})
+        haircut_lut = np.array([haircuts.get(kind, 0.0) for kind in arrays.collateral_types] + [0.0])
+        collateral = np.nan_to_num(arrays.collateral_value, nan=0.0)
+        effective_collateral = collateral * (1 - haircut_lut[arrays.collateral_type])
+        return np.maximum(0.0, arrays.exposure_at_default() - effective_collateral)
+    
+    def _sa_risk_weights(self, arrays: PortfolioArrays) -> np.ndarray:
+        """
+        Standardized risk weight for every exposure in the portfolio.
+        
+        The weight only depends on class, rating, commercial sector and whether
+        collateral is held, so it is evaluated once per distinct combination.
+        """
+        if not len(arrays):
+            return np.zeros(0)
+        
+        commercial_lut = np.array(["commercial" in sector.lower() for sector in arrays.sectors] + [False])
+        keys = np.stack([
+            arrays.exposure_class.astype(np.int64),
+            arrays.external_rating.astype(np.int64),
+            commercial_lut[arrays.sector].astype(np.int64),
+            (np.nan_to_num(arrays.collateral_value, nan=0.0) != 0).astype(np.int64),
+        ], axis=1)
+        combinations, inverse = np.unique(keys, axis=0, return_inverse=True)
+        
+        ratings = arrays.external_ratings
+        weights = np.array([
+            self._standardized_risk_weight(EXPOSURE_CLASSES[cls], ratings[rating] if rating >= 0 else None,
+                                           bool(commercial), bool(secured))
+            for cls, rating, commercial, secured in combinations.tolist()
+        ])
+        return weights[inverse.ravel()]
+    
     def _calculate_exposure_sa_rwa(self, exposure: Exposure) -> float:
         """Calculate RWA for single exposure using Standardized Approach."""
         # Get Exposure at Default
@@ -68,9 +109,16 @@ class CreditRiskCalculator:
     
     def _get_standardized_risk_weight(self, exposure: Exposure) -> float:
         """Get risk weight for exposure under Standardized Approach."""
-        exposure_class = exposure.exposure_class
-        rating = exposure.external_rating
-        
+        return self._standardized_risk_weight(
+            exposure.exposure_class,
+            exposure.external_rating,
+            bool(exposure.sector and "commercial" in exposure.sector.lower()),
+            bool(exposure.crm and exposure.crm.collateral_value),
+        )
+    
+    def _standardized_risk_weight(self, exposure_class: ExposureClass, rating: Optional[str],
+                                  commercial: bool, secured: bool) -> float:
+        """Standardized risk weight from the attributes it depends on."""
         # Map exposure class to risk weight category
         if exposure_class == ExposureClass.SOVEREIGN:
             return self._get_sovereign_risk_weight(rating)
@@ -85,9 +133,9 @@ class CreditRiskCalculator:
         elif exposure_class == ExposureClass.RETAIL_OTHER:
             return self.config.get_risk_weight("retail_other")
         elif exposure_class == ExposureClass.REAL_ESTATE:
-            return self._get_real_estate_risk_weight(exposure)
+            return self._get_real_estate_risk_weight(exposure_class, commercial)
         elif exposure_class == ExposureClass.PAST_DUE:
-            return self._get_past_due_risk_weight(exposure)
+            return self._get_past_due_risk_weight(secured)
         else:
             return self.config.get_risk_weight("other_assets")
     
@@ -136,21 +184,21 @@ class CreditRiskCalculator:
         else:
             return self.config.get_risk_weight("corporate_b_below")
     
-    def _get_real_estate_risk_weight(self, exposure: Exposure) -> float:
+    def _get_real_estate_risk_weight(self, exposure_class: ExposureClass, commercial: bool) -> float:
         """Get real estate risk weight."""
         # Check for high volatility commercial real estate
-        if exposure.sector and "commercial" in exposure.sector.lower():
-            return self.config.get_risk_weight("hvcre", 1.5)
+        if commercial:
+            return self.config.get_risk_weight("hvcre")
         
         # Residential vs commercial
-        if exposure.exposure_class == ExposureClass.RETAIL_MORTGAGE:
+        if exposure_class == ExposureClass.RETAIL_MORTGAGE:
             return self.config.get_risk_weight("real_estate_residential")
         else:
             return self.config.get_risk_weight("real_estate_commercial")
     
-    def _get_past_due_risk_weight(self, exposure: Exposure) -> float:
+    def _get_past_due_risk_weight(self, secured: bool) -> float:
         """Get past due risk weight based on collateral."""
-        if exposure.crm and exposure.crm.collateral_value:
+        if secured:
             return self.config.get_risk_weight("past_due_secured")
         else:
             return self.config.get_risk_weight("past_due_unsecured")
@@ -158,14 +206,27 @@ class CreditRiskCalculator:
     def calculate_irb_rwa(self, portfolio: Portfolio, 
                          approach: CreditApproach) -> float:
         """Calculate RWA using IRB approach (mock implementation)."""
-        total_rwa = 0.0
+        from ..core._kernels import irb_risk_weights
         
-        for exposure in portfolio.get_banking_book_exposures():
-            if exposure.is_trading_book():
-                continue
-            
-            rwa = self._calculate_exposure_irb_rwa(exposure, approach)
-            total_rwa += rwa
+        arrays = portfolio.to_arrays()
+        banking_book = ~arrays.trading_book
+        
+        pd_ = arrays.probability_of_default[banking_book]
+        lgd = arrays.loss_given_default[banking_book]
+        ead = arrays.exposure_at_default()[banking_book]
+        sa_rwa = (self._sa_exposure_at_default(arrays) * self._sa_risk_weights(arrays))[banking_book]
+        
+        # Exposures without PD, LGD or EAD fall back to the standardized approach
+        use_irb = (pd_ > 0) & (lgd > 0) & (ead != 0)
+        maturity = arrays.maturity[banking_book][use_irb]
+        maturity = np.where(np.isnan(maturity), 2.5, np.clip(maturity, 1.0, 5.0))
+        retail = np.isin(arrays.exposure_class[banking_book][use_irb], _RETAIL_CLASS_CODES)
+        
+        rwa = sa_rwa.copy()
+        risk_weights = irb_risk_weights(pd_[use_irb], lgd[use_irb], maturity, retail)
+        # Apply floor (typically 72.5% of SA RWA)
+        rwa[use_irb] = np.maximum(ead[use_irb] * risk_weights, sa_rwa[use_irb] * 0.725)
+        total_rwa = sum(rwa.tolist())
         
         logger.info(f"Calculated IRB Credit RWA: {total_rwa:,.0f}")
         return total_rwa
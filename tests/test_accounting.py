@@ -0,0 +1,136 @@
+"""Tests for IFRS 9 accounting components."""
+
+import numpy as np
+import pytest
+
+from src.basileia.core.exposure import Exposure, ExposureType, ExposureClass, Portfolio
+from src.basileia.accounting import ifrs9
+from src.basileia.accounting import stage_transition_matrix
+from src.basileia.accounting.ifrs9 import IFRS9Calculator, ECLResult, ECLStage
+
+
+def _staging_portfolio():
+    """Portfolio covering every staging trigger, set as ad-hoc exposure attributes."""
+    triggers = [
+        {},
+        {"days_past_due": 45},
+        {"days_past_due": 120},
+        {"defaulted": True},
+        {"defaulted": True, "expected_recovery_rate": 0.6},
+        {"origination_pd": 0.004},
+        {"origination_pd": 0.05},
+        {"origination_pd": -0.01},
+        {"rating_downgrade_notches": 3},
+        {"rating_downgrade_notches": 1},
+    ]
+    portfolio = Portfolio(portfolio_id="staging")
+    for i, extra in enumerate(triggers * 2):
+        exposure = Exposure(
+            exposure_id=f"exp_{i:03d}",
+            exposure_type=ExposureType.LOANS,
+            exposure_class=ExposureClass.CORPORATE,
+            original_exposure=100000,
+            current_exposure=50000 + 1000 * i,
+            probability_of_default=None if i % 7 == 0 else 0.002 * (i + 1),
+            loss_given_default=None if i % 5 == 0 else 0.4,
+            maturity=None if i % 3 == 0 else 2.0 + i % 4
+        )
+        for name, value in extra.items():
+            object.__setattr__(exposure, name, value)
+        portfolio.add_exposure(exposure)
+    return portfolio
+
+
+class TestECLResult:
+    """Test ECL result model."""
+
+    def test_stage_serialises_by_label(self):
+        """Test the stage round-trips through JSON as its reporting label."""
+        result = ECLResult(
+            exposure_id="exp_001",
+            stage=ECLStage.STAGE_2,
+            ecl_amount=1000,
+            ead=100000,
+            lgd=0.45
+        )
+
+        assert result.model_dump(mode="json")["stage"] == "stage_2"
+
+        restored = ECLResult.model_validate_json(result.model_dump_json())
+        assert restored.stage is ECLStage.STAGE_2
+        assert restored.coverage_ratio == pytest.approx(0.01)
+
+
+class TestIFRS9Calculator:
+    """Test IFRS 9 ECL calculations."""
+
+    @pytest.mark.parametrize("n_workers", [1, 2])
+    def test_chunked_matches_scalar(self, monkeypatch, n_workers):
+        """Test the vectorised large-portfolio path agrees with per-exposure staging."""
+        calculator = IFRS9Calculator()
+        portfolio = _staging_portfolio()
+
+        expected = {
+            exposure.exposure_id: calculator.calculate_exposure_ecl(exposure)
+            for exposure in portfolio.exposures
+        }
+        monkeypatch.setattr(ifrs9, "PARALLEL_ECL_THRESHOLD", 0)
+        results = calculator.calculate_portfolio_ecl(portfolio, n_workers=n_workers)
+
+        assert set(results) == set(expected)
+        assert {result.stage for result in results.values()} == set(ECLStage)
+        for exposure_id, result in results.items():
+            reference = expected[exposure_id]
+            assert result.stage == reference.stage
+            assert result.ecl_amount == pytest.approx(reference.ecl_amount)
+            assert result.lgd == pytest.approx(reference.lgd)
+            assert result.pd_lifetime == pytest.approx(reference.pd_lifetime)
+            assert result.significant_increase_risk == reference.significant_increase_risk
+            assert result.credit_impaired == reference.credit_impaired
+
+
+class TestStageTransitionMatrix:
+    """Test the structural stage transition model."""
+
+    def test_rows_are_stochastic(self):
+        """Test every row is a probability distribution and Stage 3 is absorbing."""
+        for rho, credit_cycle in [(0.0, 0.0), (0.12, 0.0), (0.24, -2.0), (0.24, 1.5)]:
+            matrix = stage_transition_matrix(rho, (0.01, 0.08), 1, credit_cycle)
+
+            assert matrix.shape == (3, 3)
+            assert np.all(matrix >= 0)
+            np.testing.assert_allclose(matrix.sum(axis=1), 1.0)
+            np.testing.assert_array_equal(matrix[2], [0.0, 0.0, 1.0])
+
+    def test_reproduces_pd_vector_without_correlation(self):
+        """Test default probabilities equal the stage PDs when rho = 0 and Z = 0."""
+        matrix = stage_transition_matrix(0.0, (0.01, 0.08))
+
+        np.testing.assert_allclose(matrix[:2, 2], [0.01, 0.08])
+
+    def test_downturn_raises_default_rates(self):
+        """Test a negative systematic factor increases default probabilities."""
+        base = stage_transition_matrix(0.2, (0.01, 0.08), 1, 0.0)
+        downturn = stage_transition_matrix(0.2, (0.01, 0.08), 1, -2.0)
+
+        assert np.all(downturn[:2, 2] > base[:2, 2])
+
+    def test_horizon_uses_cached_one_year_matrix(self):
+        """Test multi-year matrices are powers of the cached one-year matrix."""
+        ifrs9._stage_transition_matrix.cache_clear()
+        one_year = stage_transition_matrix(0.15, (0.02, 0.1))
+        three_year = stage_transition_matrix(0.15, (0.02, 0.1), 3)
+
+        np.testing.assert_allclose(three_year, np.linalg.matrix_power(one_year, 3))
+        assert ifrs9._stage_transition_matrix.cache_info().hits >= 1
+        assert stage_transition_matrix(0.15, (0.02, 0.1), 3) is three_year
+        assert not three_year.flags.writeable
+
+    def test_rejects_invalid_parameters(self):
+        """Test invalid horizons, correlations and PD orderings are rejected."""
+        with pytest.raises(ValueError):
+            stage_transition_matrix(0.1, (0.01, 0.08), 0)
+        with pytest.raises(ValueError):
+            stage_transition_matrix(1.0, (0.01, 0.08))
+        with pytest.raises(ValueError):
+            stage_transition_matrix(0.1, (0.08, 0.01))
@@ -10,7 +10,7 @@ from src.basileia.core.exposure import (
 from src.basileia.core.capital import (
     Capital, CapitalComponents, CapitalInstrument, CapitalTier
 )
-from src.basileia.core.buffers import RegulatoryBuffers, BufferType
+from src.basileia.core.buffers import RegulatoryBuffers, BufferType, BufferBreach
 from src.basileia.core.config import BaselConfig
 from src.basileia.core.engine import BaselEngine
 
@@ -250,6 +250,53 @@ class TestPortfolio:
         assert "counterparty_hhi" in metrics
         assert "sector_hhi" in metrics
 
+    def test_columnar_cache_tracks_edits(self):
+        """Test cached portfolio columns follow appends and in-place edits."""
+        portfolio = Portfolio(portfolio_id="test")
+        for i in range(3):
+            portfolio.add_exposure(Exposure(
+                exposure_id=f"exp_{i}",
+                exposure_type=ExposureType.LOANS,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=100000,
+                current_exposure=100000
+            ))
+
+        assert portfolio.get_total_exposure() == 300000
+
+        portfolio.exposures[0].current_exposure = 200000
+        assert portfolio.get_total_exposure() == 400000
+
+        portfolio.exposures[1] = portfolio.exposures[1].model_copy(
+            update={"exposure_class": ExposureClass.BANK}
+        )
+        portfolio.invalidate_cache()
+        assert len(portfolio.get_exposures_by_class(ExposureClass.BANK)) == 1
+
+    def test_to_lazyframe(self):
+        """Test Polars export of the portfolio columns."""
+        pl = pytest.importorskip("polars")
+        portfolio = Portfolio(portfolio_id="test")
+        for i in range(4):
+            portfolio.add_exposure(Exposure(
+                exposure_id=f"exp_{i}",
+                counterparty_id=f"counterparty_{i % 2}",
+                exposure_type=ExposureType.LOANS,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=100000,
+                current_exposure=100000 * (i + 1)
+            ))
+
+        totals = (
+            portfolio.to_lazyframe()
+            .group_by("counterparty_id")
+            .agg(pl.col("current_exposure").sum())
+            .sort("counterparty_id")
+            .collect()
+        )
+
+        assert totals["current_exposure"].to_list() == [400000, 600000]
+
 
 class TestCapital:
     """Test capital models and calculations."""
@@ -316,6 +363,53 @@ class TestCapital:
         assert "tier1_capital" in summary
         assert "total_capital" in summary
     
+    def test_instrument_index_tracks_edits(self):
+        """Test per-tier instrument totals follow in-place edits."""
+        capital = Capital()
+        capital.add_instrument(CapitalInstrument(
+            instrument_id="cet1_001",
+            instrument_name="Common shares",
+            tier=CapitalTier.CET1,
+            amount=100
+        ))
+        assert capital.get_total_instrument_amount(CapitalTier.CET1) == 100
+
+        capital.instruments[0].amount = 150
+        assert capital.get_total_instrument_amount(CapitalTier.CET1) == 150
+
+        capital.instruments[0] = CapitalInstrument(
+            instrument_id="at1_001",
+            instrument_name="AT1 note",
+            tier=CapitalTier.AT1,
+            amount=100
+        )
+        assert capital.get_total_instrument_amount(CapitalTier.CET1) == 0
+        assert capital.get_total_instrument_amount(CapitalTier.AT1) == 100
+
+    def test_component_bounds(self):
+        """Test capital value objects reject out-of-range amounts."""
+        with pytest.raises(ValueError):
+            CapitalComponents(common_shares=-5)
+        with pytest.raises(ValueError):
+            CapitalInstrument(
+                instrument_id="at1_001",
+                instrument_name="AT1 note",
+                tier=CapitalTier.AT1,
+                amount=-100
+            )
+
+        components = CapitalComponents(common_shares="100", retained_earnings=-20)
+        assert components.calculate_cet1() == 80
+
+    def test_capital_json_round_trip(self):
+        """Test capital rebuilt by validation computes the same totals."""
+        capital = Capital(components={"common_shares": 1000000, "at1_instruments": 200000})
+        restored = Capital.model_validate_json(capital.model_dump_json())
+
+        assert capital.calculate_tier1_capital() == 1200000
+        assert restored.calculate_tier1_capital() == 1200000
+        assert restored.get_capital_summary() == capital.get_capital_summary()
+
     def test_capital_validation(self):
         """Test capital structure validation."""
         # Valid capital structure
@@ -364,6 +458,18 @@ class TestRegulatoryBuffers:
         assert breakdown["gsib"] == 0.015
         assert breakdown["total"] == 0.05
     
+    def test_buffer_cache_on_copy(self):
+        """Test copied buffers and returned breakdowns do not share cached state."""
+        buffers = RegulatoryBuffers(conservation_buffer=0.025)
+        assert buffers.get_total_buffer_requirement() == pytest.approx(0.025)
+
+        copied = buffers.model_copy(update={"countercyclical_buffer": 0.02})
+        assert copied.get_total_buffer_requirement() == pytest.approx(0.045)
+
+        breakdown = buffers.get_buffer_breakdown()
+        breakdown["total"] = 1.0
+        assert buffers.get_buffer_breakdown()["total"] == pytest.approx(0.025)
+
     def test_gsib_bucket_setting(self):
         """Test G-SIB bucket buffer setting."""
         buffers = RegulatoryBuffers()
@@ -420,6 +526,51 @@ class TestRegulatoryBuffers:
         
         assert mda_restrictions["applicable"] is True
         assert mda_restrictions["restriction_pct"] > 0
+        assert "description" in mda_restrictions
+        assert "description" not in buffers.get_mda_restrictions(breaches, describe=False)
+
+    def test_buffer_breach_bounds(self):
+        """Test buffer breaches reject negative shortfalls."""
+        with pytest.raises(ValueError):
+            BufferBreach(
+                buffer_type=BufferType.CONSERVATION,
+                required_ratio=0.07,
+                actual_ratio=0.06,
+                shortfall_ratio=-1,
+                shortfall_amount=0
+            )
+
+    def test_buffer_breaches_batch(self):
+        """Test vectorised breach detection matches the scalar check."""
+        buffers = RegulatoryBuffers(
+            conservation_buffer=0.025,
+            countercyclical_buffer=0.01
+        )
+
+        cet1_ratios = [0.05, 0.075, 0.12]
+        result = buffers.check_buffer_breaches_batch(cet1_ratios, 1000000)
+
+        assert list(result["breached"]) == [True, True, False]
+        assert set(result["breaches"]) == {0, 1}
+
+        for i, ratio in enumerate(cet1_ratios):
+            breaches = buffers.check_buffer_breaches(ratio, ratio, ratio, 1000000)
+            if breaches:
+                batch_breach = result["breaches"][i]
+                assert batch_breach.shortfall_amount == pytest.approx(breaches[0].shortfall_amount)
+                assert batch_breach.mda_restriction_pct == breaches[0].mda_restriction_pct
+
+    def test_simulate_batch(self):
+        """Test batch buffer simulation agrees with the breach check."""
+        buffers = RegulatoryBuffers(conservation_buffer=0.025)
+
+        cet1_ratios = [0.05, 0.065, 0.1]
+        simulation = buffers.simulate_batch(cet1_ratios, 1000000)
+        breaches = buffers.check_buffer_breaches_batch(cet1_ratios, 1000000)
+
+        assert simulation["required_cet1_ratio"] == pytest.approx(0.07)
+        assert list(simulation["mda_restriction_pct"]) == list(breaches["mda_restriction_pct"])
+        assert simulation["capital_shortfall"] == pytest.approx(breaches["shortfall_amount"])
 
 
 class TestBaselConfig:
@@ -434,6 +585,27 @@ class TestBaselConfig:
         assert "buffers" in config.model_dump()
         assert "minimum_ratios" in config.model_dump()
     
+    def test_config_copy(self):
+        """Test copies of the shared default can be modified independently."""
+        default = BaselConfig.load_default()
+        config = default.model_copy()
+
+        config.buffers = {**config.buffers, "conservation": 0.03}
+
+        assert config.get_buffer_requirement("conservation") == 0.03
+        assert default.get_buffer_requirement("conservation") == 0.025
+
+    def test_default_config_is_read_only(self):
+        """Test the shared default configuration cannot be edited in place."""
+        config = BaselConfig.load_default()
+
+        with pytest.raises(TypeError):
+            config.buffers["conservation"] = 0.5
+        with pytest.raises(AttributeError):
+            config.buffers = {}
+
+        assert config.get_buffer_requirement("conservation") == config.buffers["conservation"]
+
     def test_risk_weight_lookup(self):
         """Test risk weight lookup functionality."""
         config = BaselConfig.load_default()
@@ -590,3 +762,117 @@ class TestBaselEngine:
         assert "portfolio_stats" in diagnostics
         assert "capital_stats" in diagnostics
         assert "config_summary" in diagnostics
+
+    def test_portfolio_breakdowns(self):
+        """Test columnar diagnostics breakdowns and per-exposure validation issues."""
+        engine = BaselEngine()
+        
+        portfolio = Portfolio(portfolio_id="test")
+        profiles = [
+            (ExposureType.LOANS, "BBB", 0.02, 10.0),
+            (ExposureType.SECURITIES, "AAA", None, None),
+            (ExposureType.LOANS, None, 0.01, 55.0),
+            (ExposureType.COMMITMENTS, "BBB", None, 60.0),
+        ]
+        for i, (exposure_type, rating, pd, maturity) in enumerate(profiles):
+            portfolio.add_exposure(Exposure(
+                exposure_id=f"exp_{i}",
+                exposure_type=exposure_type,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=100000,
+                current_exposure=100000 * (i + 1),
+                external_rating=rating,
+                probability_of_default=pd,
+                maturity=maturity
+            ))
+        
+        assert engine._get_exposure_type_breakdown(portfolio) == {
+            "loans": 400000, "securities": 200000, "commitments": 400000
+        }
+        assert engine._get_rating_distribution(portfolio) == {"BBB": 2, "AAA": 1, "unrated": 1}
+        
+        capital = Capital(components=CapitalComponents(common_shares=100000))
+        issues = engine.validate_inputs(portfolio, capital)
+        assert [issue for issue in issues if issue.startswith("Exposure")] == [
+            "Exposure 2 has invalid risk parameters"
+        ]
+
+    def test_concurrent_matches_sequential(self):
+        """Test pooled RWA calculations match the sequential path."""
+        portfolio = Portfolio(portfolio_id="test")
+        for i, exposure_type in enumerate([ExposureType.LOANS, ExposureType.TRADING_SECURITIES]):
+            portfolio.add_exposure(Exposure(
+                exposure_id=f"exp_{i}",
+                exposure_type=exposure_type,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=100000,
+                current_exposure=100000,
+                market_value=100000
+            ))
+        capital = Capital(components=CapitalComponents(common_shares=100000))
+        
+        sequential = BaselEngine(max_workers=1)
+        pooled = BaselEngine()
+        try:
+            assert pooled.calculate_rwa_only(portfolio) == sequential.calculate_rwa_only(portfolio)
+            expected = sequential.calculate_all_metrics(portfolio, capital)
+            result = pooled.calculate_all_metrics(portfolio, capital)
+            assert result.model_dump() == expected.model_dump()
+        finally:
+            pooled.close()
+
+    def test_rwa_cache(self):
+        """Test RWA results are reused for unchanged portfolios and refreshed after edits."""
+        engine = BaselEngine(BaselConfig.load_default().model_copy(), max_workers=1)
+        calls = []
+        calculate = engine.credit_calculator.calculate_total_rwa
+        engine.credit_calculator.calculate_total_rwa = lambda portfolio: calls.append(1) or calculate(portfolio)
+        
+        def build_portfolio():
+            portfolio = Portfolio(portfolio_id="test")
+            portfolio.add_exposure(Exposure(
+                exposure_id="test_001",
+                exposure_type=ExposureType.LOANS,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=100000,
+                current_exposure=100000
+            ))
+            return portfolio
+        
+        portfolio = build_portfolio()
+        first = engine.calculate_rwa_only(portfolio)
+        first["total_rwa"] = 0
+        assert engine.calculate_rwa_only(build_portfolio())["total_rwa"] > 0
+        assert len(calls) == 1
+        
+        portfolio.exposures[0].current_exposure = 200000
+        assert engine.calculate_rwa_only(portfolio)["credit_rwa"] == 200000
+        assert len(calls) == 2
+        
+        engine.config.minimum_ratios = {"cet1_minimum": 0.05}
+        engine.calculate_rwa_only(portfolio)
+        assert len(calls) == 3
+
+    def test_run_scenarios(self):
+        """Test scenario fan-out across processes matches in-process results."""
+        engine = BaselEngine(max_workers=1)
+        portfolios, capitals = [], []
+        for i in range(3):
+            portfolio = Portfolio(portfolio_id=f"scenario_{i}")
+            portfolio.add_exposure(Exposure(
+                exposure_id="test_001",
+                exposure_type=ExposureType.LOANS,
+                exposure_class=ExposureClass.CORPORATE,
+                original_exposure=1000000,
+                current_exposure=1000000 * (i + 1)
+            ))
+            portfolios.append(portfolio)
+            capitals.append(Capital(components=CapitalComponents(common_shares=100000 * (i + 1))))
+        
+        expected = engine.run_scenarios(portfolios, capitals)
+        results = engine.run_scenarios(portfolios, capitals, n_workers=2)
+        
+        assert [r.model_dump() for r in results] == [r.model_dump() for r in expected]
+        assert [r.credit_rwa for r in results] == [1000000, 2000000, 3000000]
+        with pytest.raises(ValueError):
+            engine.run_scenarios(portfolios, capitals[:1])
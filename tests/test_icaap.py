@@ -0,0 +1,40 @@
+"""Tests for ICAAP components."""
+
+import numpy as np
+import pytest
+
+from src.basileia.icaap.capital_planning import CapitalPlanningEngine
+
+
+class TestCapitalPlanningEngine:
+    """Test capital planning projections."""
+
+    def test_capital_plan(self):
+        """Test yearly projections compound the default growth assumptions."""
+        plan = CapitalPlanningEngine().generate_capital_plan(100, 1000, planning_horizon=5)
+
+        assert list(plan["projections"]) == [f"year_{year}" for year in range(1, 6)]
+        for year in range(1, 6):
+            projection = plan["projections"][f"year_{year}"]
+            assert projection["projected_rwa"] == pytest.approx(1000 * 1.1 ** year)
+            assert projection["projected_capital"] == pytest.approx(100 * 1.05 ** year)
+            assert projection["surplus_deficit"] == pytest.approx(
+                100 * 1.05 ** year - 0.08 * 1000 * 1.1 ** year
+            )
+        assert plan["recommendations"] == ["Capital shortfall expected in year_5"]
+
+    def test_scenario_projections_match_plan(self):
+        """Test constant-growth scenario paths reproduce the single plan."""
+        engine = CapitalPlanningEngine()
+        plan = engine.generate_capital_plan(100, 1000, planning_horizon=4)
+
+        projected = engine.project_scenarios(100, 1000, np.full((3, 4), 0.05), np.full((3, 4), 0.10))
+
+        assert projected["capital_ratio"].shape == (3, 4)
+        expected = [plan["projections"][f"year_{year}"]["capital_ratio"] for year in range(1, 5)]
+        np.testing.assert_allclose(projected["capital_ratio"], np.tile(expected, (3, 1)))
+
+    def test_scenario_shape_mismatch(self):
+        """Test growth paths of different shapes are rejected."""
+        with pytest.raises(ValueError):
+            CapitalPlanningEngine().project_scenarios(100, 1000, np.zeros((2, 3)), np.zeros((2, 4)))
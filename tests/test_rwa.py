@@ -94,7 +94,17 @@ class TestCreditRiskCalculator:
         # IRB should generally produce different results than SA
         sa_rwa = calculator.calculate_standardized_rwa(sample_portfolio)
         assert rwa != sa_rwa
-    
+
+    def test_irb_matches_per_exposure(self, calculator, sample_portfolio):
+        """Test the array IRB path agrees with the per-exposure formula."""
+        rwa = calculator.calculate_irb_rwa(sample_portfolio, CreditApproach.IRB_ADVANCED)
+        expected = sum(
+            calculator._calculate_exposure_irb_rwa(exposure, CreditApproach.IRB_ADVANCED)
+            for exposure in sample_portfolio.get_banking_book_exposures()
+        )
+
+        assert rwa == pytest.approx(expected)
+
     def test_risk_weight_lookup(self, calculator):
         """Test risk weight lookup for different asset classes and ratings."""
         # Test sovereign risk weights